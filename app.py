@@ -1,12 +1,61 @@
 # app.py
-from flask import Flask, render_template, request, jsonify
-from core.predictor import KinaseMutationPredictor, load_kinase_list, load_gene_list, predict_once
-import markdown
+from flask import Flask, Response, render_template, request, jsonify, send_file, stream_with_context
+from core.predictor import INVALID_POSITION, IMPACT_CATEGORIES, get_predictor, load_kinase_list, load_gene_list, mutation_args
+from core.result import RESPONSE_FORMATS
+from core.suggest import SuggestIndex
+from core.metrics import metrics_from_env
+from core.reload import reloader_from_env
+import base64, hashlib, hmac, io, json, os, re, time
+import numpy as np
 
 app = Flask(__name__)
-predictor = KinaseMutationPredictor()
+predictor = get_predictor()
 KINASES = load_kinase_list()
 GENES   = load_gene_list()
+BATCH_CHUNK = 2000
+SUGGEST = {"kinase": SuggestIndex(KINASES), "gene": SuggestIndex(GENES)}
+SUGGEST_LIMIT = 100
+SITES_TOP_K_MAX = 1000
+SUBSTITUTION = re.compile(r"^([A-Z*]?)([+-]\d+)([A-Z])$")  # e.g. "P+1A", "*-3D", "+2G"
+METRICS = metrics_from_env()  # Prometheus /metrics; METRICS=0 leaves the app uninstrumented
+
+if METRICS:
+    METRICS.instrument(predictor)
+
+    @app.before_request
+    def _start_timer():
+        request.environ["kmp.started"] = time.perf_counter()
+
+    @app.after_request
+    def _record_request(response):
+        started = request.environ.get("kmp.started")
+        if started is not None:
+            METRICS.observe_request(request.endpoint, response.status_code, time.perf_counter() - started)
+        return response
+
+    @app.route("/metrics")
+    def metrics():
+        return Response(METRICS.render(), mimetype="text/plain; version=0.0.4")
+
+def _prepare(fresh):
+    # Runs on a reloaded predictor before it is swapped in.
+    if METRICS:
+        METRICS.instrument(fresh)
+
+RELOADER = reloader_from_env(_prepare)  # hot reload of changed reference files (REFERENCE_RELOAD_INTERVAL)
+ADMIN_TOKEN = os.environ.get("ADMIN_TOKEN")  # enables POST /admin/reload
+
+@app.before_request
+def _follow_reloads():
+    # Pick up a reload done by another worker (or this one's polling thread, if enabled).
+    RELOADER.follow()
+    RELOADER.ensure_running()
+
+def _versioned(response, p):
+    # Ties the response (and anything cached from it) to the reference data that produced it.
+    response.headers["X-Data-Version"] = p.data_version
+    response.headers["X-Scoring-Scheme"] = p.scoring_scheme
+    return response
 
 @app.route("/")
 def index():
@@ -18,23 +67,199 @@ def index():
         "position": 6,               # 1-based in UI
         "new_aa": "A"
     }
-    return render_template("index.html", kinases=KINASES, genes=GENES, defaults=defaults)
+    # The kinase/gene pickers are filled lazily from /api/suggest.
+    return render_template("index.html", defaults=defaults)
+
+@app.route("/healthz")
+def healthz():
+    p = get_predictor()
+    return jsonify({"status": "ok", "data_version": p.data_version, "scoring_scheme": p.scoring_scheme})
+
+@app.route("/api/stats")
+def api_stats():
+    p = get_predictor()
+    return jsonify({"data_version": p.data_version, "scoring_scheme": p.scoring_scheme,
+                    "cache": p.cache.stats() if p.cache else None,
+                    "reload": RELOADER.stats()})
+
+@app.route("/admin/reload", methods=["POST"])
+def admin_reload():
+    # Re-check the reference files now and swap in changed tables; the other workers follow on their next request.
+    supplied = request.headers.get("Authorization", "").removeprefix("Bearer ").strip()
+    if not ADMIN_TOKEN:
+        return jsonify({"error": "Reloading is disabled; set ADMIN_TOKEN to enable it."}), 404
+    if not hmac.compare_digest(supplied.encode(), ADMIN_TOKEN.encode()):
+        return jsonify({"error": "Invalid admin token."}), 403
+    try:
+        return jsonify(RELOADER.reload())
+    except Exception as e:
+        return jsonify({"error": f"Reload failed, still serving {get_predictor().data_version}: {e}"}), 500
+
+@app.route("/api/suggest")
+def api_suggest():
+    # Typeahead for the kinase/gene pickers: ?type=gene|kinase&q=<text>&limit=20
+    kind = request.args.get("type", "gene")
+    index = SUGGEST.get(kind)
+    if index is None:
+        return jsonify({"error": "type must be 'gene' or 'kinase'."}), 400
+    q = request.args.get("q", "").strip()
+    try:
+        limit = max(1, min(SUGGEST_LIMIT, int(request.args.get("limit", 20))))
+    except ValueError:
+        limit = 20
+    response = jsonify({"type": kind, "q": q, "results": index.suggest(q, limit)})
+    # Results only change with the name lists, so let browsers and proxies reuse them.
+    response.set_etag(index.version + "-" + hashlib.sha256(f"{kind}|{limit}|{q}".encode()).hexdigest()[:16])
+    response.cache_control.public = True
+    response.cache_control.max_age = 3600
+    return response.make_conditional(request)
 
 @app.route("/api/predict", methods=["POST"])
 def api_predict():
     data = request.get_json(force=True)
-    kinase   = (data.get("kinase") or "").strip()
-    gene     = (data.get("gene") or "").strip()
-    substrate= (data.get("substrate") or "").strip().upper()
-    position = int(data.get("position") or 0)  # 1-based
-    new_aa   = (data.get("new_aa") or "").strip().upper()
-
-    overall, details_md = predictor.predict_mutation_impact(
-        kinase, gene, substrate, position-1, substrate[position-1] if substrate and 1 <= position <= len(substrate) else "", new_aa
-    ) if substrate and 1 <= position <= len(substrate) else predict_once(kinase, gene, substrate, position, new_aa)
-
-    details_html = markdown.markdown(details_md, extensions=["extra"])
-    return jsonify({"overall": overall, "details_html": details_html})
+    args = _batch_row(data)
+
+    p = get_predictor()
+    result = p.predict_mutation_impact(*args) if args is not None else INVALID_POSITION
+
+    return _versioned(jsonify({**result.to_dict(_response_format(data, default="html")), "data_version": p.data_version}), p)
+
+def _response_format(data=None, default="html"):
+    # ?format= (or a "format" field in the JSON body) wins; otherwise an explicit
+    # text/markdown or text/html Accept entry picks the details rendering, and a
+    # client that accepts nothing but JSON gets the compact form.
+    fmt = request.args.get("format") or (data.get("format") if isinstance(data, dict) else None)
+    if fmt in RESPONSE_FORMATS:
+        return fmt
+    accepted = {mimetype for mimetype, _ in request.accept_mimetypes}
+    if "text/markdown" in accepted:
+        return "markdown"
+    if "text/html" in accepted:
+        return "html"
+    if accepted == {"application/json"}:
+        return "compact"
+    return default
+
+def _batch_row(data):
+    # Predictor arguments for one JSON mutation (position is 1-based), or None if the position is unusable.
+    return mutation_args(data.get("kinase"), data.get("gene"), data.get("substrate"), data.get("position"), data.get("new_aa"))
+
+def _predict_chunk(p, items, fmt):
+    rows = [_batch_row(d) if isinstance(d, dict) else None for d in items]
+    valid = [r for r in rows if r is not None]
+    scored = iter(p.predict_batch(valid))
+    for r in rows:
+        yield (next(scored) if r is not None else INVALID_POSITION).to_dict(fmt)
+
+def _ndjson_chunks(stream):
+    chunk = []
+    for line in stream:
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            chunk.append(json.loads(line))
+        except ValueError:
+            chunk.append(None)
+        if len(chunk) >= BATCH_CHUNK:
+            yield chunk; chunk = []
+    if chunk:
+        yield chunk
+
+@app.route("/api/predict/batch", methods=["POST"])
+def api_predict_batch():
+    # Accepts a JSON list (or {"mutations": [...]}) of /api/predict payloads, or an
+    # NDJSON stream of them; NDJSON input is answered with a streamed NDJSON response.
+    fmt = _response_format(default="markdown")
+    p = get_predictor()  # the whole stream is scored on one data version
+    if request.mimetype in ("application/x-ndjson", "application/jsonlines"):
+        stream = request.stream
+        def generate():
+            for chunk in _ndjson_chunks(stream):
+                for result in _predict_chunk(p, chunk, fmt):
+                    yield json.dumps(result) + "\n"
+        return _versioned(Response(stream_with_context(generate()), mimetype="application/x-ndjson"), p)
+
+    data = request.get_json(force=True)
+    items = data.get("mutations") if isinstance(data, dict) else data
+    if not isinstance(items, list):
+        return jsonify({"error": "Expected a JSON list of mutations or {\"mutations\": [...]}."}), 400
+    return _versioned(jsonify({"results": list(_predict_chunk(p, items, fmt)), "data_version": p.data_version}), p)
+
+@app.route("/api/scan", methods=["POST"])
+def api_scan():
+    # Saturation scan of one substrate across a kinase panel (default: every kinase in the list).
+    # Scores come back as a base64 float16 cube [position, amino acid, kinase], or as an .npz with format=npz.
+    data = request.get_json(force=True)
+    substrate = (data.get("substrate") or "").strip().upper()
+    kinases = data.get("kinases") or KINASES
+    p = get_predictor()
+    try:
+        scan = p.scan_substrate(substrate, kinases)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
+    if (data.get("format") or request.args.get("format")) == "npz":
+        buf = io.BytesIO()
+        np.savez_compressed(buf, scores=scan["scores"].astype(np.float32), categories=scan["categories"],
+                            kinases=np.array(scan["kinases"]), amino_acids=np.array(list(scan["amino_acids"])),
+                            category_labels=np.array(IMPACT_CATEGORIES))
+        buf.seek(0)
+        return _versioned(send_file(buf, mimetype="application/octet-stream", as_attachment=True,
+                                    download_name=f"scan_{substrate}.npz"), p)
+    return _versioned(jsonify({
+        "substrate": scan["motif"],
+        "kinases": scan["kinases"],
+        "amino_acids": scan["amino_acids"],
+        "shape": list(scan["scores"].shape),
+        "scores": base64.b64encode(scan["scores"].astype("<f2").tobytes()).decode(),
+        "scores_dtype": "float16",
+        "categories": base64.b64encode(scan["categories"].tobytes()).decode(),
+        "category_labels": list(IMPACT_CATEGORIES),
+        "data_version": p.data_version,
+    }), p)
+
+def _int_field(value, default):
+    # A JSON integer (or a string holding one, e.g. "+1"); floats and booleans are
+    # rejected with None rather than truncated. Missing or empty fields take the default.
+    if value is None or value == "":
+        return default
+    if isinstance(value, str):
+        return int(value) if re.fullmatch(r"\s*[+-]?\d+\s*", value) else None
+    return value if isinstance(value, int) and not isinstance(value, bool) else None
+
+@app.route("/api/sites", methods=["POST"])
+def api_sites():
+    # Reverse query: rank the Ochoa phosphosites a substitution disrupts most for one kinase.
+    # {"kinase": "AKT1", "substitution": "P+1A", "top_k": 50}, or offset/original_aa/new_aa fields.
+    data = request.get_json(force=True)
+    kinase = (data.get("kinase") or "").strip()
+    m = SUBSTITUTION.match((data.get("substitution") or "").strip().upper())
+    if m:
+        original_aa, offset, new_aa = m.group(1).strip("*"), int(m.group(2)), m.group(3)
+    else:
+        original_aa = (data.get("original_aa") or "").strip().upper().strip("*")
+        offset, new_aa = _int_field(data.get("offset"), 0), (data.get("new_aa") or "").strip().upper()
+    top_k = _int_field(data.get("top_k"), 50)
+    if offset is None:
+        return jsonify({"error": "offset must be an integer between -5 and +5."}), 400
+    if top_k is None:
+        return jsonify({"error": f"top_k must be an integer between 1 and {SITES_TOP_K_MAX}."}), 400
+    p = get_predictor()
+    try:
+        ranked = p.rank_sites(kinase, offset, new_aa, original_aa or None, max(1, min(SITES_TOP_K_MAX, top_k)))
+    except (TypeError, ValueError) as e:
+        return jsonify({"error": str(e)}), 400
+
+    ranked["data_version"] = p.data_version
+    if (data.get("format") or request.args.get("format")) == "ndjson" or request.accept_mimetypes.best == "application/x-ndjson":
+        sites = ranked.pop("sites")
+        def generate():
+            yield json.dumps(ranked) + "\n"
+            for site in sites:
+                yield json.dumps(site) + "\n"
+        return _versioned(Response(generate(), mimetype="application/x-ndjson"), p)
+    return _versioned(jsonify(ranked), p)
 
 if __name__ == "__main__":
     app.run(debug=True, host="127.0.0.1", port=5000)
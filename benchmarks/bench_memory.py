@@ -0,0 +1,81 @@
+# benchmarks/bench_memory.py
+"""Per-worker memory of the gunicorn deployment with and without ``preload_app``.
+
+Starts ``gunicorn -c gunicorn.conf.py`` twice (GUNICORN_PRELOAD=0, then 1),
+warms every worker with a few predictions and reports each worker's RSS,
+PSS (shared pages split between processes) and USS (pages private to it)
+from /proc/<pid>/smaps_rollup.  Linux only.
+
+    python -m benchmarks.bench_memory [--requests 50]
+"""
+import argparse, json, os, socket, subprocess, sys, time, urllib.request
+from pathlib import Path
+
+BASE_DIR = Path(__file__).resolve().parent.parent
+PAYLOAD = {"kinase": "AKT1", "gene": "GSK3B", "substrate": "GGRARTSSFAE", "position": 8, "new_aa": "A"}
+
+
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def _memory_kb(pid: int) -> dict:
+    fields = {}
+    with open(f"/proc/{pid}/smaps_rollup") as f:
+        for line in f:
+            parts = line.split()
+            if len(parts) == 3 and parts[2] == "kB":
+                fields[parts[0].rstrip(":")] = int(parts[1])
+    return {"rss": fields.get("Rss", 0), "pss": fields.get("Pss", 0),
+            "uss": fields.get("Private_Clean", 0) + fields.get("Private_Dirty", 0)}
+
+
+def _children(pid: int) -> list:
+    with open(f"/proc/{pid}/task/{pid}/children") as f:
+        return [int(p) for p in f.read().split()]
+
+
+def measure(preload: bool, requests: int) -> dict:
+    port = _free_port()
+    env = dict(os.environ, GUNICORN_PRELOAD="1" if preload else "0")
+    proc = subprocess.Popen([sys.executable, "-m", "gunicorn", "app:app", "-c", "gunicorn.conf.py",
+                             "--bind", f"127.0.0.1:{port}", "--log-level", "warning"], cwd=BASE_DIR, env=env)
+    try:
+        body = json.dumps(PAYLOAD).encode()
+        deadline = time.time() + 120
+        while True:
+            try:
+                req = urllib.request.Request(f"http://127.0.0.1:{port}/api/predict", data=body,
+                                             headers={"Content-Type": "application/json"})
+                urllib.request.urlopen(req, timeout=30).read()
+                break
+            except OSError:
+                if time.time() > deadline or proc.poll() is not None:
+                    raise RuntimeError("gunicorn did not come up")
+                time.sleep(0.2)
+        for _ in range(requests):
+            urllib.request.urlopen(urllib.request.Request(f"http://127.0.0.1:{port}/api/predict", data=body,
+                                                          headers={"Content-Type": "application/json"}), timeout=30).read()
+        workers = {pid: _memory_kb(pid) for pid in _children(proc.pid)}
+        return {"master": _memory_kb(proc.pid), "workers": workers}
+    finally:
+        proc.terminate(); proc.wait(timeout=30)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--requests", type=int, default=50, help="warm-up requests after startup")
+    args = parser.parse_args(argv)
+    for preload in (False, True):
+        result = measure(preload, args.requests)
+        print(f"preload_app={preload}")
+        for pid, mem in result["workers"].items():
+            print(f"  worker {pid}: rss {mem['rss'] / 1024:7.1f} MB  pss {mem['pss'] / 1024:7.1f} MB  uss {mem['uss'] / 1024:7.1f} MB")
+        total_pss = sum(m["pss"] for m in result["workers"].values()) + result["master"]["pss"]
+        print(f"  total PSS incl. master: {total_pss / 1024:.1f} MB")
+
+
+if __name__ == "__main__":
+    main()
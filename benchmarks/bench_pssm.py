@@ -0,0 +1,50 @@
+# benchmarks/bench_pssm.py
+"""Microbenchmark: PSSM probability lookup via DataFrame ``.loc`` vs the dense tensor.
+
+    python -m benchmarks.bench_pssm [--n 20000]
+"""
+import argparse, time
+import numpy as np
+
+from core.predictor import KinaseMutationPredictor
+
+AAS = "ARNDCQEGHILKMFPSTWYV"
+
+
+def _best_of(fn, repeat=5) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        t0 = time.perf_counter(); fn(); best = min(best, time.perf_counter() - t0)
+    return best
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--n", type=int, default=20000, help="lookups per run")
+    args = parser.parse_args(argv)
+
+    predictor = KinaseMutationPredictor()
+    matrix, pssm = predictor.serthr_matrices, predictor.serthr_pssm
+    rng = np.random.default_rng(0)
+    kinases = rng.choice(pssm.kinases, args.n)
+    residues = rng.choice(list(AAS), args.n)
+    rel = rng.choice([p for p in range(-5, 6) if p], args.n)
+    queries = list(zip(kinases.tolist(), residues.tolist(), rel.tolist()))
+
+    kinase_ids = np.fromiter((pssm.kinase_id(k) for k in kinases), dtype=np.intp, count=args.n)
+    residue_ids = pssm.residue_ids(residues.tolist())
+    slots = rel + 5
+
+    results = {
+        "DataFrame .loc (get_probability)": _best_of(lambda: [predictor.get_probability(k, a, r, matrix) for k, a, r in queries]),
+        "PSSMTensor.lookup (scalar)": _best_of(lambda: [pssm.lookup(k, a, r) for k, a, r in queries]),
+        "PSSMTensor.gather (vectorized)": _best_of(lambda: pssm.gather(kinase_ids, slots, residue_ids)),
+    }
+    base = results["DataFrame .loc (get_probability)"]
+    print(f"{args.n} lookups, best of 5")
+    for name, secs in results.items():
+        print(f"  {name:<34} {secs * 1e3:9.2f} ms  {secs / args.n * 1e9:9.0f} ns/lookup  {base / secs:8.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,56 @@
+# benchmarks/bench_rng.py
+"""Microbenchmark: per-mutation draws under scoring scheme v1 (SHA-256 + PCG64) vs v2 (key hash + Philox).
+
+Times the per-call generator (``_draws_for`` plus its ten ``uniform`` draws),
+the bulk draws ``predict_batch`` makes, and single predictions end to end.
+
+    python -m benchmarks.bench_rng [--n 20000]
+"""
+import argparse, time
+import numpy as np
+
+from core.batch import MAX_DRAWS
+from core.predictor import KinaseMutationPredictor
+from core.rng import SCHEMES
+from benchmarks.synthetic import AAS
+
+
+def _best_of(fn, repeat=5) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        t0 = time.perf_counter(); fn(); best = min(best, time.perf_counter() - t0)
+    return best
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--n", type=int, default=20000, help="mutations per run")
+    args = parser.parse_args(argv)
+
+    predictors = {scheme: KinaseMutationPredictor(scoring_scheme=scheme) for scheme in SCHEMES}
+    rng = np.random.default_rng(0)
+    kinases = rng.choice(predictors["v1"].serthr_pssm.kinases, args.n).tolist()
+    motifs = ["".join(rng.choice(list(AAS), 5)) + "S" + "".join(rng.choice(list(AAS), 5)) for _ in range(args.n)]
+    positions = rng.choice([p for p in range(11) if p != 5], args.n).tolist()
+    new = rng.choice(list(AAS), args.n).tolist()
+    rows = list(zip(kinases, motifs, positions, new))
+    keys = [f"{k}||{m}||{p}||{aa}" for k, m, p, aa in rows]
+    calls = rows[:2000]
+
+    def draw_each(p):
+        for row in rows:
+            g = p._draws_for(*row)
+            for _ in range(MAX_DRAWS):
+                g.uniform(0.0, 1.0)
+
+    print(f"{args.n} mutations, {MAX_DRAWS} draws each (us per mutation)")
+    for scheme, p in predictors.items():
+        per_call = _best_of(lambda: draw_each(p), repeat=3) / args.n * 1e6
+        bulk = _best_of(lambda: p._uniforms_for(keys)) / args.n * 1e6
+        predict = _best_of(lambda: [p.predict_mutation_impact(k, "G", m, pos, m[pos], aa) for k, m, pos, aa in calls],
+                           repeat=3) / len(calls) * 1e6
+        print(f"  {scheme}  per call {per_call:7.2f}   batched {bulk:6.2f}   predict_mutation_impact {predict:7.2f}")
+
+
+if __name__ == "__main__":
+    main()
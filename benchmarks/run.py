@@ -0,0 +1,246 @@
+# benchmarks/run.py
+"""Benchmark suite for the predictor hot paths, with JSON output for comparing commits.
+
+Runs against synthetic Ochoa tables (``benchmarks.synthetic``) of
+configurable size and times:
+
+  * predictor construction from the source files and from the snapshot
+  * ``predict_mutation_impact``: central S/T/Y loss short-circuit, full
+    scoring path, and the full path through the result cache
+  * ``_check_disease_association`` hits and misses
+  * ``POST /api/predict`` end to end through the Flask test client
+
+    python -m benchmarks.run                          # print a table
+    python -m benchmarks.run --json base.json         # save results
+    python -m benchmarks.run --compare base.json      # diff against a saved run
+    python -m benchmarks.run --stages                 # per-stage perf_counter totals
+    python -m benchmarks.run --profile prof/          # cProfile dump per benchmark
+"""
+from collections import Counter, defaultdict
+from functools import wraps
+from pathlib import Path
+import argparse, cProfile, json, platform, subprocess, sys, time
+import numpy as np
+import pandas as pd
+
+import core.predictor as predictor_module
+import core.result as result_module
+from core.cache import ResultCache
+from core.metrics import PREDICT_STAGES
+from core.predictor import KinaseMutationPredictor
+from benchmarks.synthetic import AAS, miss_queries, synthetic_data
+
+BASE_DIR = Path(__file__).resolve().parent.parent
+
+# Stages of construction (class/module attributes); the per-call stages are shared with core.metrics.
+LOAD_STAGES = {
+    "possible_mutations": "_load_possible_mutations", "pssm_workbooks": "_load_probability_matrices",
+    "disease_workbook": "_load_disease_association_data", "ochoa_csv": "_load_ochoa_data",
+}
+LOAD_FUNCTIONS = {"snapshot_read": "load_snapshot", "snapshot_write": "write_snapshot"}
+
+
+class StageTimer:
+    """Opt-in ``perf_counter`` hook: wraps predictor methods and accumulates time per stage."""
+
+    def __init__(self):
+        self.seconds = defaultdict(float); self.calls = Counter(); self._restore = []
+
+    def _wrap(self, stage, fn):
+        @wraps(fn)
+        def timed(*args, **kwargs):
+            t0 = time.perf_counter()
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                self.seconds[stage] += time.perf_counter() - t0; self.calls[stage] += 1
+        return timed
+
+    def attach(self, predictor):
+        for stage, attr in PREDICT_STAGES.items():
+            setattr(predictor, attr, self._wrap(stage, getattr(predictor, attr)))
+        return self
+
+    def patch(self, owner, attr, stage):
+        fn = getattr(owner, attr)
+        self._restore.append((owner, attr, fn))
+        setattr(owner, attr, self._wrap(stage, fn))
+        return self
+
+    def attach_loaders(self):
+        for stage, attr in LOAD_STAGES.items():
+            self.patch(KinaseMutationPredictor, attr, stage)
+        for stage, attr in LOAD_FUNCTIONS.items():
+            self.patch(predictor_module, attr, stage)
+        return self
+
+    def detach(self):
+        for owner, attr, fn in reversed(self._restore):
+            setattr(owner, attr, fn)
+        self._restore.clear()
+
+    def report(self) -> dict:
+        return {stage: {"calls": self.calls[stage], "total_ms": self.seconds[stage] * 1e3,
+                        "mean_us": self.seconds[stage] / self.calls[stage] * 1e6}
+                for stage in self.seconds if self.calls[stage]}
+
+
+def _stats(samples) -> dict:
+    s = np.asarray(samples) * 1e6
+    return {"calls": len(s), "min_us": float(s.min()), "median_us": float(np.median(s)), "mean_us": float(s.mean()),
+            "p95_us": float(np.percentile(s, 95)), "ops_per_sec": float(len(s) / (s.sum() / 1e6))}
+
+
+def _time_calls(fn, calls, warmup=20) -> list:
+    for args in calls[:warmup]:
+        fn(*args)
+    samples = []
+    for args in calls:
+        t0 = time.perf_counter(); fn(*args); samples.append(time.perf_counter() - t0)
+    return samples
+
+
+def _mutations(predictor, genes, n, short_circuit, seed):
+    """Random valid ``predict_mutation_impact`` args, either all short-circuited or all fully scored."""
+    rng = np.random.default_rng(seed)
+    out = []
+    for _ in range(n):
+        tyrosine = rng.random() < 0.3
+        pssm = predictor.tyrosine_pssm if tyrosine else predictor.serthr_pssm
+        motif = list(rng.choice(list(AAS), 11)); motif[5] = "Y" if tyrosine else str(rng.choice(["S", "T"]))
+        motif = "".join(motif)
+        if short_circuit:
+            position, new_aa = 5, str(rng.choice([a for a in AAS if a not in "STY"]))
+        else:
+            position = int(rng.choice([p for p in range(11) if p != 5]))
+            new_aa = str(rng.choice([a for a in AAS if a != motif[position]]))
+        out.append((str(rng.choice(pssm.kinases)), str(rng.choice(genes)), motif, position, motif[position], new_aa))
+    return out
+
+
+def _git_revision() -> dict:
+    try:
+        rev = subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=BASE_DIR, capture_output=True, text=True).stdout.strip()
+        dirty = bool(subprocess.run(["git", "status", "--porcelain", "--untracked-files=no"], cwd=BASE_DIR,
+                                    capture_output=True, text=True).stdout.strip())
+        return {"commit": rev or None, "dirty": dirty}
+    except OSError:
+        return {"commit": None, "dirty": None}
+
+
+def run(args) -> dict:
+    results, stages = {}, {}
+
+    def record(name, fn, calls, timer=None):
+        prof = cProfile.Profile() if args.profile else None
+        if prof:
+            prof.enable()
+        try:
+            results[name] = _stats(_time_calls(fn, calls, warmup=0 if name.startswith("construct") else 20))
+        finally:
+            if prof:
+                prof.disable(); prof.dump_stats(str(Path(args.profile) / f"{name}.prof"))
+        if timer is not None:
+            stages[name] = timer.report()
+        print(f"  {name:<28} {results[name]['median_us']:>12.1f} us median  {results[name]['ops_per_sec']:>12,.0f} ops/s",
+              file=sys.stderr)
+
+    with synthetic_data(args.ochoa_rows, args.seed) as (_, ochoa, hits):
+        genes = ochoa["Gene"].unique().tolist()
+
+        constructions = (("construct_sources", lambda: KinaseMutationPredictor(use_snapshot=False), args.cold_repeat),
+                         ("construct_snapshot", KinaseMutationPredictor, args.cold_repeat * 5))
+        for name, construct, repeat in constructions:
+            if name == "construct_snapshot":
+                KinaseMutationPredictor()  # compile the snapshot first
+            timer = StageTimer().attach_loaders() if args.stages else None
+            try:
+                record(name, construct, [()] * repeat, timer)
+            finally:
+                if timer:
+                    timer.detach()
+
+        def predictor_for(cache=None, warm=()):
+            p = KinaseMutationPredictor(cache=cache)
+            for a in warm:
+                p.predict_mutation_impact(*a)
+            return p, (StageTimer().attach(p) if args.stages else None)
+
+        p, timer = predictor_for()
+        record("predict_short_circuit", lambda *a: p.predict_mutation_impact(*a).markdown,
+               _mutations(p, genes, args.calls, True, args.seed), timer)
+        p, timer = predictor_for()
+        full = _mutations(p, genes, args.calls, False, args.seed + 1)
+        record("predict_full", lambda *a: p.predict_mutation_impact(*a).markdown, full, timer)
+        p, timer = predictor_for(ResultCache(args.calls * 2), warm=full)
+        record("predict_full_cached", lambda *a: p.predict_mutation_impact(*a).markdown, full, timer)
+
+        p, timer = predictor_for()
+        hit_calls = [hits[i % len(hits)] for i in range(args.calls)] if hits else []
+        if hit_calls:
+            record("disease_hit", p._check_disease_association, hit_calls, timer)
+        p, timer = predictor_for()
+        record("disease_miss", p._check_disease_association, miss_queries(ochoa, args.calls, args.seed), timer)
+
+        p, timer = predictor_for()
+        predictor_module._predictor, saved = p, predictor_module._predictor
+        try:
+            from app import app as flask_app  # handlers use get_predictor(), i.e. p
+            if timer:
+                timer.patch(result_module, "render_html", "html")
+            client = flask_app.test_client()
+            payloads = [({"kinase": k, "gene": g, "substrate": m, "position": pos + 1, "new_aa": n},) for k, g, m, pos, _, n in full]
+            record("api_predict", lambda body: client.post("/api/predict", json=body), payloads, timer)
+        finally:
+            predictor_module._predictor = saved
+            if timer:
+                timer.detach()
+
+    return {
+        "meta": {**_git_revision(), "created": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+                 "python": platform.python_version(), "numpy": np.__version__, "pandas": pd.__version__,
+                 "platform": platform.platform(), "ochoa_rows": args.ochoa_rows, "calls": args.calls, "seed": args.seed},
+        "benchmarks": results,
+        **({"stages": stages} if stages else {}),
+    }
+
+
+def compare(current: dict, baseline: dict):
+    base = baseline.get("benchmarks", {})
+    print(f"vs {baseline.get('meta', {}).get('commit')} (median; + is slower)")
+    for name, entry in current["benchmarks"].items():
+        if name in base:
+            change = (entry["median_us"] / base[name]["median_us"] - 1) * 100
+            print(f"  {name:<28} {base[name]['median_us']:>12.1f} -> {entry['median_us']:>12.1f} us  {change:+7.1f}%")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.run", description=__doc__.splitlines()[0])
+    parser.add_argument("--ochoa-rows", type=int, default=20000, help="synthetic Ochoa rows (default: %(default)s)")
+    parser.add_argument("--calls", type=int, default=2000, help="timed calls per benchmark (default: %(default)s)")
+    parser.add_argument("--cold-repeat", type=int, default=3, help="constructions from source files (default: %(default)s)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--json", type=Path, help="write results to this file")
+    parser.add_argument("--compare", type=Path, help="baseline JSON to compare against")
+    parser.add_argument("--stages", action="store_true", help="record per-stage perf_counter timings")
+    parser.add_argument("--profile", type=Path, help="write a cProfile .prof file per benchmark into this directory")
+    args = parser.parse_args(argv)
+    if args.profile:
+        args.profile.mkdir(parents=True, exist_ok=True)
+
+    results = run(args)
+    if args.json:
+        args.json.write_text(json.dumps(results, indent=1))
+    if args.stages:
+        for name, report in results["stages"].items():
+            print(f"{name}:")
+            for stage, entry in sorted(report.items(), key=lambda kv: -kv[1]["total_ms"]):
+                print(f"  {stage:<20} {entry['calls']:>8} calls  {entry['mean_us']:>10.1f} us mean  {entry['total_ms']:>10.1f} ms")
+    if args.compare:
+        compare(results, json.loads(args.compare.read_text()))
+    elif not args.json:
+        print(json.dumps(results, indent=1))
+
+
+if __name__ == "__main__":
+    main()
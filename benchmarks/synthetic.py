@@ -0,0 +1,88 @@
+# benchmarks/synthetic.py
+"""Synthetic Ochoa phosphosite tables of configurable size for benchmarking.
+
+``synthetic_data(rows)`` writes four ``ochoa_part_*.csv`` files into a
+temporary directory and points ``core.predictor`` at them (and at a
+snapshot directory next to them) for the duration of the ``with`` block.
+The real PSSM workbooks, OMIM mutations and disease associations are used
+as they are.  Part of the rows are anchored on disease-association entries
+so that disease lookups have real hits; ``hit_queries``/``miss_queries``
+return lookups that are known to hit or miss.
+"""
+from contextlib import contextmanager
+from pathlib import Path
+import re, shutil, tempfile
+import numpy as np
+import pandas as pd
+
+import core.predictor as predictor_module
+from core.disease import AA_1_TO_3
+
+AAS = "ARNDCQEGHILKMFPSTWYV"
+AA_3_TO_1 = {v: k for k, v in AA_1_TO_3.items()}
+OCHOA_PARTS = ("OCHOA_PART_1", "OCHOA_PART_2", "OCHOA_PART_3", "OCHOA_PART_4")
+
+
+def _window(rng, length=15) -> str:
+    return "".join(rng.choice(list(AAS), length))
+
+
+def make_ochoa(rows: int, disease: pd.DataFrame, genes: list, seed: int = 0):
+    """Return ``(ochoa_frame, hits)``; ``hits`` are ``_check_disease_association`` args known to match."""
+    rng = np.random.default_rng(seed)
+    records, hits = [], []
+    anchors = []
+    for gene, mutation in zip(disease.get("Gene", []), disease.get("Mutation", [])):
+        m = re.match(r"([A-Z]{3})(\d+)([A-Z]{3})$", str(mutation).upper())
+        if isinstance(gene, str) and m and m.group(1) in AA_3_TO_1 and m.group(3) in AA_3_TO_1:
+            anchors.append((gene, AA_3_TO_1[m.group(1)], int(m.group(2)), AA_3_TO_1[m.group(3)]))
+    # Anchored rows: the original residue sits mid-window, so substrate window[2:13] with the
+    # mutation at motif position 6 maps back onto the disease entry's residue number.
+    for gene, orig, pos, new in anchors[: rows // 2]:
+        w = list(_window(rng)); w[7] = orig; w = "".join(w)
+        records.append({"Gene": gene, "Phosphosite": f"{rng.choice(list('STY'))}{pos}", "sequence_window": w})
+        hits.append((gene, w[2:13], orig, 6, new))
+    filler = np.asarray(genes or ["GENE1"])
+    while len(records) < rows:
+        w = _window(rng)
+        if rng.random() < 0.05:
+            w = "_______" + w[7:]
+        records.append({"Gene": str(rng.choice(filler)), "Phosphosite": f"{rng.choice(list('STY'))}{rng.integers(1, 3000)}",
+                        "sequence_window": w})
+    frame = pd.DataFrame(records)
+    frame["localization_prob"] = rng.random(len(frame)).round(3)
+    return frame, hits
+
+
+def miss_queries(ochoa: pd.DataFrame, n: int, seed: int = 1) -> list:
+    """Half unknown genes, half known genes with a substrate that is not in any of their windows."""
+    rng = np.random.default_rng(seed)
+    genes = ochoa["Gene"].tolist()
+    out = []
+    for i in range(n):
+        gene = f"NOGENE{i}" if i % 2 else str(rng.choice(genes))
+        out.append((gene, _window(rng, 11), "A", 6, "V"))
+    return out
+
+
+@contextmanager
+def synthetic_data(rows: int = 20000, seed: int = 0):
+    """Yield ``(data_dir, ochoa_frame, hits)`` with ``core.predictor`` reading the synthetic Ochoa CSVs."""
+    tmp = Path(tempfile.mkdtemp(prefix="kmp-bench-"))
+    saved = {name: getattr(predictor_module, name) for name in (*OCHOA_PARTS, "REFERENCE_SOURCES", "SNAPSHOT_DIR")}
+    try:
+        disease = pd.read_excel(predictor_module.DISEASE_DATA_FILE) if predictor_module.DISEASE_DATA_FILE.exists() else pd.DataFrame()
+        ochoa, hits = make_ochoa(rows, disease, predictor_module.load_gene_list(), seed)
+        parts = []
+        for i, (name, chunk) in enumerate(zip(OCHOA_PARTS, np.array_split(np.arange(len(ochoa)), len(OCHOA_PARTS)))):
+            path = tmp / f"ochoa_part_{i + 1}.csv"
+            ochoa.iloc[chunk].to_csv(path, index=False)
+            setattr(predictor_module, name, path); parts.append(path)
+        original_parts = {saved[name] for name in OCHOA_PARTS}
+        predictor_module.REFERENCE_SOURCES = [p for p in saved["REFERENCE_SOURCES"] if p not in original_parts] + parts
+        predictor_module.SNAPSHOT_DIR = tmp / "snapshot"
+        yield tmp, ochoa, hits
+    finally:
+        for name, value in saved.items():
+            setattr(predictor_module, name, value)
+        shutil.rmtree(tmp, ignore_errors=True)
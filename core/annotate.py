@@ -0,0 +1,202 @@
+# core/annotate.py
+"""Stream-annotate large mutation files with kinase impact predictions.
+
+Input is read lazily in chunks, the chunks are scored by a pool of worker
+processes (each loads the reference data once) and written back in input
+order as they complete, so memory stays bounded by ``chunk_size * workers``.
+
+    python -m core.annotate mutations.tsv annotated.tsv
+    python -m core.annotate mutations.csv.gz - --workers 8 --chunk-size 5000
+    python -m core.annotate mutations.vcf annotated.vcf
+
+TSV/CSV files need a header with ``kinase``, ``substrate``, ``position``
+(1-based, within the substrate) and ``new_aa`` columns, plus an optional
+``gene``; the same fields as ``/api/predict``.  Prediction columns are
+appended to each row.  VCF-like files carry the fields as ``KINASE``,
+``GENE``, ``SUBSTRATE``, ``POSITION`` and ``NEW_AA`` INFO keys and get
+``KMP_*`` INFO keys added.
+"""
+from collections import Counter, deque
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import nullcontext
+from itertools import islice
+from pathlib import Path
+import argparse, csv, gzip, io, os, sys, time
+
+from core.predictor import INVALID_POSITION, get_predictor, mutation_args
+from core.rng import SCHEMES
+from core.result import IMPACT_KEYS, ImpactCategory
+
+FIELDS = ("kinase", "gene", "substrate", "position", "new_aa")
+REQUIRED = ("kinase", "substrate", "position", "new_aa")
+OUTPUT_FIELDS = ("impact", "score", *(f"{k}_impact" for k in IMPACT_KEYS), "disease_hits", "error")
+VCF_INFO = (
+    '##INFO=<ID=KMP_IMPACT,Number=1,Type=String,Description="Kinase mutation impact category">',
+    '##INFO=<ID=KMP_SCORE,Number=1,Type=Float,Description="Normalized total impact score (0-100)">',
+    f'##INFO=<ID=KMP_IMPACTS,Number={len(IMPACT_KEYS)},Type=Float,Description="Sub-impacts: {",".join(IMPACT_KEYS)}">',
+    '##INFO=<ID=KMP_DISEASE_HITS,Number=1,Type=Integer,Description="Matching disease-association entries">',
+)
+
+
+def _annotate(chunk):
+    """Worker: score a chunk of parsed rows, returning picklable ``(overall, score, impacts, hits, error)`` tuples."""
+    valid = [args for args in chunk if args is not None]
+    scored = iter(get_predictor().predict_batch(valid))
+    out = []
+    for args in chunk:
+        r = next(scored) if args is not None else INVALID_POSITION
+        out.append((r.overall, r.score, tuple(r.impacts[k] for k in IMPACT_KEYS) if r.impacts else (),
+                    r.disease_hits if r.error is None else (), r.error))
+    return out
+
+
+# ---- formats --------------------------------------------------------------
+
+def _delimited(lines, out, delimiter):
+    reader = csv.reader(lines, delimiter=delimiter)
+    header = next(reader, None)
+    if header is None:
+        return iter(()), None
+    cols = {name.strip().lower(): i for i, name in enumerate(header)}
+    missing = [f for f in REQUIRED if f not in cols]
+    if missing:
+        raise ValueError(f"missing column(s): {', '.join(missing)}")
+    writer = csv.writer(out, delimiter=delimiter, lineterminator="\n")
+    writer.writerow(header + list(OUTPUT_FIELDS))
+    get = lambda row, f: row[cols[f]] if f in cols and cols[f] < len(row) else ""
+
+    def emit(row, annotation):
+        overall, score, impacts, hits, error = annotation
+        writer.writerow(row + [overall, "" if score is None else f"{score:.2f}",
+                               *([f"{v:.2f}" for v in impacts] or [""] * len(IMPACT_KEYS)),
+                               "; ".join(hits), error or ""])
+
+    return ((row, mutation_args(*(get(row, f) for f in FIELDS))) for row in reader), emit
+
+
+def _vcf(lines, out):
+    lines = iter(lines)
+    for line in lines:
+        if line.startswith("#CHROM"):
+            out.write("".join(f"{meta}\n" for meta in VCF_INFO))
+            out.write(line)
+            break
+        if not line.startswith("#"):
+            raise ValueError("no #CHROM header")
+        out.write(line)
+    else:
+        raise ValueError("no #CHROM header")
+
+    def parse(line):
+        cols = line.rstrip("\n").split("\t")
+        info = dict(kv.split("=", 1) if "=" in kv else (kv, "") for kv in cols[7].split(";")) if len(cols) > 7 else {}
+        return cols, mutation_args(*(info.get(f.upper()) for f in FIELDS))
+
+    def emit(cols, annotation):
+        overall, score, impacts, hits, error = annotation
+        added = [f"KMP_IMPACT={ImpactCategory(overall).name}"]
+        if score is not None:
+            added.append(f"KMP_SCORE={score:.2f}")
+        if impacts:
+            added.append("KMP_IMPACTS=" + ",".join(f"{v:.2f}" for v in impacts))
+        if error is None:
+            added.append(f"KMP_DISEASE_HITS={len(hits)}")
+        while len(cols) < 8:
+            cols.append(".")
+        cols[7] = ";".join(([] if cols[7] in ("", ".") else [cols[7]]) + added)
+        out.write("\t".join(cols) + "\n")
+
+    return (parse(line) for line in lines if line.strip()), emit
+
+
+def _open(path, mode):
+    if str(path) == "-":
+        return nullcontext(sys.stdin if mode == "r" else sys.stdout)
+    if str(path).endswith(".gz"):
+        return io.TextIOWrapper(gzip.open(path, mode + "b"), newline="")
+    return open(path, mode, newline="")
+
+
+def detect_format(path) -> str:
+    suffixes = [s.lower() for s in Path(str(path)).suffixes if s.lower() != ".gz"]
+    ext = suffixes[-1] if suffixes else ""
+    return {".vcf": "vcf", ".csv": "csv"}.get(ext, "tsv")
+
+
+# ---- pipeline -------------------------------------------------------------
+
+def _chunks(records, size):
+    records = iter(records)
+    while chunk := list(islice(records, size)):
+        yield chunk
+
+
+def annotate_file(src, dst, fmt=None, workers=None, chunk_size=2000, progress=None) -> dict:
+    """Annotate ``src`` into ``dst`` (paths or ``-``); returns counts and throughput."""
+    fmt = fmt or detect_format(src)
+    workers = (os.cpu_count() or 1) if workers is None else workers
+    t0 = time.perf_counter()
+    counts = Counter()
+    with _open(src, "r") as fin, _open(dst, "w") as fout:
+        records, emit = _vcf(fin, fout) if fmt == "vcf" else _delimited(fin, fout, "," if fmt == "csv" else "\t")
+
+        def write(chunk, annotations):
+            for (raw, _), annotation in zip(chunk, annotations):
+                emit(raw, annotation)
+                counts[annotation[0]] += 1
+            fout.flush()
+            if progress:
+                progress(sum(counts.values()), time.perf_counter() - t0)
+
+        if workers <= 1:
+            for chunk in _chunks(records, chunk_size):
+                write(chunk, _annotate([args for _, args in chunk]))
+        else:
+            with ProcessPoolExecutor(workers, initializer=get_predictor) as pool:
+                # At most two chunks in flight per worker; written strictly in submission order.
+                pending = deque()
+                for chunk in _chunks(records, chunk_size):
+                    pending.append((chunk, pool.submit(_annotate, [args for _, args in chunk])))
+                    if len(pending) >= 2 * workers:
+                        chunk, future = pending.popleft(); write(chunk, future.result())
+                while pending:
+                    chunk, future = pending.popleft(); write(chunk, future.result())
+    elapsed = time.perf_counter() - t0
+    total = sum(counts.values())
+    return {"mutations": total, "invalid": counts[ImpactCategory.INVALID.value], "categories": dict(counts),
+            "seconds": elapsed, "per_second": total / elapsed if elapsed else 0.0}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m core.annotate", description="Annotate a TSV/CSV/VCF mutation file.")
+    parser.add_argument("input", help="input file, optionally .gz ('-' for stdin)")
+    parser.add_argument("output", help="output file, optionally .gz ('-' for stdout)")
+    parser.add_argument("--format", choices=["tsv", "csv", "vcf"], help="input/output format (default: from the input extension)")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="worker processes; 1 scores inline (default: %(default)s)")
+    parser.add_argument("--chunk-size", type=int, default=2000, help="mutations per chunk (default: %(default)s)")
+    parser.add_argument("--scheme", choices=SCHEMES, help="scoring scheme (default: $SCORING_SCHEME, else v1)")
+    parser.add_argument("--quiet", action="store_true", help="do not report progress")
+    args = parser.parse_args(argv)
+    if args.scheme:
+        os.environ["SCORING_SCHEME"] = args.scheme  # read by get_predictor here and in the workers
+
+    def progress(done, elapsed):
+        print(f"\r{done} mutations, {done / elapsed:,.0f}/s", end="", file=sys.stderr, flush=True)
+
+    show = not args.quiet and sys.stderr.isatty()
+    try:
+        stats = annotate_file(args.input, args.output, args.format, args.workers, args.chunk_size, progress if show else None)
+    except (OSError, ValueError) as e:
+        print(f"error: {e}", file=sys.stderr); return 1
+    if show:
+        print(file=sys.stderr)
+    if not args.quiet:
+        print(f"annotated {stats['mutations']} mutations ({stats['invalid']} invalid) in {stats['seconds']:.2f}s "
+              f"({stats['per_second']:,.0f} mutations/s)", file=sys.stderr)
+        for label, n in sorted(stats["categories"].items(), key=lambda kv: -kv[1]):
+            print(f"  {label}: {n}", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
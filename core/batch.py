@@ -0,0 +1,165 @@
+# core/batch.py
+import numpy as np
+
+from core.result import ImpactCategory
+
+AMINO_ACIDS = "ARNDCQEGHILKMFPSTWYV"
+MAX_DRAWS = 10  # charge 2 + size 2 + hydrophobicity 2 + polarity 2 + probability 1 + aromatic 1
+MAX_THEORETICAL_IMPACT = 520.0
+IMPACT_CATEGORIES = (ImpactCategory.HIGH, ImpactCategory.MODERATE, ImpactCategory.LOW, ImpactCategory.MINIMAL, ImpactCategory.ENHANCEMENT)
+
+
+def _max(a, b):
+    # Python's max(a, b) keeps ``a`` on ties; mirror it exactly.
+    return np.where(b > a, b, a)
+
+
+def _min(a, b):
+    return np.where(b < a, b, a)
+
+
+def categorize(scores) -> np.ndarray:
+    """Vectorized ``_impact_category``: uint8 indexes into ``IMPACT_CATEGORIES``."""
+    scores = np.asarray(scores)
+    return np.select([scores >= 70, scores >= 40, scores >= 10, scores >= -10], [0, 1, 2, 3], 4).astype(np.uint8)
+
+
+class ReplayRNG:
+    """Feeds pre-drawn ``random()`` values back through ``uniform`` in call order."""
+    __slots__ = ("_draws", "_i")
+
+    def __init__(self, draws):
+        self._draws = [float(u) for u in draws]; self._i = 0
+
+    def uniform(self, low, high):
+        u = self._draws[self._i]; self._i += 1
+        return low + (high - low) * u
+
+
+class _Draws:
+    # Per-row cursor into the (n, MAX_DRAWS) matrix of uniforms; each stage only
+    # advances the rows that actually called rng.uniform in the scalar path.
+    def __init__(self, uniforms):
+        self.u = uniforms; self.rows = np.arange(len(uniforms)); self.cursor = np.zeros(len(uniforms), dtype=np.intp)
+
+    def take(self, mask, low, high):
+        u = self.u[self.rows, np.minimum(self.cursor, MAX_DRAWS - 1)]
+        self.cursor += mask
+        return np.where(mask, low + (np.subtract(high, low)) * u, 0.0)
+
+
+class BatchScorer:
+    """Vectorized twin of the six ``calculate_*_impact`` methods.
+
+    Given the same ``random()`` draws a row's ``_rng_for`` generator would
+    produce, every sub-impact and the normalized score are bit-identical to
+    ``predict_mutation_impact``.
+    """
+
+    def __init__(self, predictor):
+        props = predictor.aa_properties
+        self.aa_index = {aa: i for i, aa in enumerate(AMINO_ACIDS)}
+        self.charge = np.array([props[aa]['charge'] for aa in AMINO_ACIDS])
+        self.size = np.array([predictor.size_order.index(predictor.get_size_category(aa)) for aa in AMINO_ACIDS])
+        self.hydrophobic = np.array([props[aa]['hydrophobic'] for aa in AMINO_ACIDS])
+        self.polar = np.array([props[aa]['polar'] for aa in AMINO_ACIDS])
+        self.aromatic = np.array([props[aa]['aromatic'] for aa in AMINO_ACIDS])
+        self.weight = np.array([predictor.get_position_weight(p) for p in range(11)])
+        self.pssms = (predictor.serthr_pssm, predictor.tyrosine_pssm)
+        self.glycine, self.proline = self.aa_index['G'], self.aa_index['P']
+        self.serine, self.threonine = self.aa_index['S'], self.aa_index['T']
+
+    def score(self, kinases, motifs, positions, originals, mutated, uniforms) -> dict:
+        pos = np.asarray(positions, dtype=np.intp)
+        o = np.fromiter((self.aa_index[a] for a in originals), dtype=np.intp, count=len(pos))
+        m = np.fromiter((self.aa_index[a] for a in mutated), dtype=np.intp, count=len(pos))
+        tyrosine = np.fromiter((motif[5] == 'Y' for motif in motifs), dtype=bool, count=len(pos))
+        p_orig = np.zeros(len(pos)); p_mut = np.zeros(len(pos))
+        for is_tyr, pssm in zip((False, True), self.pssms):
+            rows = np.flatnonzero(tyrosine == is_tyr)
+            if not len(rows):
+                continue
+            kin = np.fromiter((pssm.kinase_id(kinases[r]) for r in rows), dtype=np.intp, count=len(rows))
+            p_orig[rows] = pssm.gather(kin, pos[rows], pssm.residue_ids([originals[r] for r in rows]))
+            p_mut[rows] = pssm.gather(kin, pos[rows], pssm.residue_ids([mutated[r] for r in rows]))
+        return self.score_indexed(pos, o, m, p_orig, p_mut, uniforms)
+
+    def score_indexed(self, pos, o, m, p_orig, p_mut, uniforms) -> dict:
+        """Score rows given motif positions, ``AMINO_ACIDS`` indexes and pre-gathered PSSM probabilities."""
+        w = self.weight[pos]
+        draws = _Draws(np.asarray(uniforms, dtype=np.float64).reshape(len(pos), MAX_DRAWS))
+        out = {
+            "charge": self._charge(o, m, pos, w, draws),
+            "size": self._size(o, m, w, draws),
+            "hydrophobicity": self._hydrophobicity(o, m, w, draws),
+            "polarity": self._polarity(o, m, w, draws),
+            "probability": self._probability(p_orig, p_mut, draws),
+            "aromatic": self._aromatic(o, m, w, draws),
+        }
+        total = out["charge"] + out["size"] + out["hydrophobicity"] + out["polarity"] + out["probability"] + out["aromatic"]
+        scaled = (total / MAX_THEORETICAL_IMPACT) * 100
+        out["total"] = _min(np.full_like(scaled, 100.0), _max(np.zeros_like(scaled), scaled))
+        return out
+
+    def _charge(self, o, m, pos, w, draws):
+        oc, mc = self.charge[o], self.charge[m]
+        loss = (oc != 0) & (mc == 0)
+        gain = (oc == 0) & (mc != 0)
+        reversal = (oc != 0) & (mc != 0) & (np.sign(oc) != np.sign(mc))
+        critical = w > 0.7
+        lo = np.select([loss & critical, loss, gain, reversal], [60, 20, 40, 70], 0)
+        hi = np.select([loss & critical, loss, gain, reversal], [90, 40, 80, 95], 0)
+        hit = loss | gain | reversal
+        impact = draws.take(hit, lo, hi)
+        near = hit & (pos >= 3) & (pos <= 7)
+        distal = hit & ~near & ((pos < 2) | (pos > 9))
+        impact = np.where(near, _max(impact, draws.take(near, 70, 100)), impact)
+        impact = np.where(distal, _min(impact, draws.take(distal, 10, 30)), impact)
+        return impact * w
+
+    def _size(self, o, m, w, draws):
+        oi, mi = self.size[o], self.size[m]
+        bigger, smaller, moderate = mi > oi + 1, mi < oi - 1, np.abs(mi - oi) == 1
+        critical = w > 0.7
+        conds = [bigger & critical, bigger, smaller, moderate]
+        lo = np.select(conds, [60, 20, 20, 10], 0); hi = np.select(conds, [90, 50, 60, 30], 0)
+        impact = draws.take(bigger | smaller | moderate, lo, hi)
+        flex = (o == self.glycine) & (m == self.proline)
+        impact = np.where(flex, _max(impact, draws.take(flex, 30, 70)), impact)
+        return impact * w
+
+    def _hydrophobicity(self, o, m, w, draws):
+        oh, mh = self.hydrophobic[o], self.hydrophobic[m]
+        critical = w > 0.6
+        conds = [oh & ~mh & critical, oh & ~mh, ~oh & mh & critical, ~oh & mh]
+        lo = np.select(conds, [50, 20, 40, 10], 0); hi = np.select(conds, [90, 40, 80, 30], 0)
+        impact = draws.take(oh != mh, lo, hi)
+        buried = (w > 0.8) & (oh != mh)
+        impact = np.where(buried, _max(impact, draws.take(buried, 80, 100)), impact)
+        return impact * w
+
+    def _polarity(self, o, m, w, draws):
+        op, mp = self.polar[o], self.polar[m]
+        critical = w > 0.6
+        conds = [op & ~mp & critical, op & ~mp, ~op & mp & critical, ~op & mp]
+        lo = np.select(conds, [40, 10, 40, 10], 0); hi = np.select(conds, [70, 30, 80, 40], 0)
+        impact = draws.take(op != mp, lo, hi)
+        st = np.isin(o, (self.serine, self.threonine)) & np.isin(m, (self.serine, self.threonine)) & (o != m)
+        impact = np.where(st, _max(impact, draws.take(st, 0, 20)), impact)
+        return impact * w
+
+    def _probability(self, p_orig, p_mut, draws):
+        both = (p_orig > 0) & (p_mut > 0)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            ratio = np.where(both, p_mut / np.where(p_orig > 0, p_orig, 1.0), 1.0)
+        conds = [both & (ratio < 0.5), both & (ratio > 2), both & (ratio < 1), both & (ratio > 1),
+                 (p_orig > 0) & (p_mut == 0), (p_orig == 0) & (p_mut > 0)]
+        lo = np.select(conds, [50, -30, 10, -10, 80, -50], 0); hi = np.select(conds, [90, -10, 40, 0, 100, -20], 0)
+        return draws.take(np.any(conds, axis=0), lo, hi)
+
+    def _aromatic(self, o, m, w, draws):
+        oa, ma = self.aromatic[o], self.aromatic[m]
+        critical = w > 0.6
+        conds = [oa & ~ma & critical, oa & ~ma, ~oa & ma & critical, ~oa & ma]
+        lo = np.select(conds, [30, 10, -20, -10], 0); hi = np.select(conds, [70, 30, 0, 0], 0)
+        return draws.take(oa != ma, lo, hi) * w
@@ -0,0 +1,141 @@
+# core/cache.py
+"""Bounded LRU cache of scored predictions, optionally shared between processes.
+
+Predictions are deterministic in ``(kinase, motif, position, new_aa)`` for a
+given reference-data version, so the cache stores the gene-independent part
+of a result (category, score, sub-impacts and per-property texts) under that
+key.  Entries are keyed by the data version as well, so after a reload the
+old and new predictors each find their own results while both are still
+serving requests; entries of a retired version are never hit again and age
+out of the LRU.
+
+The in-process LRU can sit in front of a shared backend.  ``SQLiteBackend``
+lets gunicorn workers on one host share hits; anything with the same
+``get``/``set``/``clear`` methods (e.g. a Redis client wrapper) can stand in.
+"""
+from collections import OrderedDict
+import json, os, sqlite3, threading, time
+from typing import Optional
+
+
+class SQLiteBackend:
+    def __init__(self, path, maxsize: int = 100_000, ttl: Optional[float] = None):
+        self.path, self.maxsize, self.ttl = str(path), maxsize, ttl
+        self._local = threading.local()
+        self._writes = 0
+        self._conn().execute("CREATE TABLE IF NOT EXISTS results (key TEXT PRIMARY KEY, version TEXT, value TEXT, "
+                             "created REAL, accessed REAL)")
+
+    def _conn(self) -> sqlite3.Connection:
+        # One connection per thread and per process (connections must not cross a fork).
+        conn = getattr(self._local, "conn", None)
+        if conn is None or self._local.pid != os.getpid():
+            conn = sqlite3.connect(self.path, timeout=5, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn, self._local.pid = conn, os.getpid()
+        return conn
+
+    def get(self, key: str, version: str):
+        conn = self._conn(); now = time.time(); key = f"{version}||{key}"
+        row = conn.execute("SELECT value, created FROM results WHERE key = ?", (key,)).fetchone()
+        if row is None:
+            return None
+        if self.ttl is not None and now - row[1] > self.ttl:
+            conn.execute("DELETE FROM results WHERE key = ?", (key,))
+            return None
+        conn.execute("UPDATE results SET accessed = ? WHERE key = ?", (now, key))
+        return json.loads(row[0])
+
+    def set(self, key: str, version: str, value) -> int:
+        """Store ``value``; returns how many entries were evicted to stay under ``maxsize``."""
+        conn = self._conn(); now = time.time()
+        conn.execute("INSERT OR REPLACE INTO results VALUES (?, ?, ?, ?, ?)",
+                     (f"{version}||{key}", version, json.dumps(value), now, now))
+        self._writes += 1
+        if self._writes % 256:
+            return 0
+        # Rows of a retired version are no longer read, so they are the least recently accessed.
+        excess = conn.execute("SELECT COUNT(*) FROM results").fetchone()[0] - self.maxsize
+        if excess > 0:
+            conn.execute("DELETE FROM results WHERE key IN (SELECT key FROM results ORDER BY accessed LIMIT ?)", (excess,))
+            return excess
+        return 0
+
+    def clear(self):
+        self._conn().execute("DELETE FROM results")
+
+
+class ResultCache:
+    def __init__(self, maxsize: int = 4096, ttl: Optional[float] = None, backend=None):
+        self.maxsize, self.ttl, self.backend = maxsize, ttl, backend
+        self._entries = OrderedDict()  # (version, key) -> (expires_at, value)
+        self._versions = set()
+        self._lock = threading.Lock()
+        self.hits = self.misses = self.shared_hits = self.evictions = self.shared_evictions = 0
+        self.expirations = self.invalidations = 0
+
+    def _check_version(self, version):
+        # A new data version supersedes the cached ones; they are left to age out rather than cleared.
+        if version not in self._versions:
+            if self._entries:
+                self.invalidations += 1
+            self._versions.add(version)
+
+    def get(self, key: str, version: str):
+        with self._lock:
+            self._check_version(version)
+            entry = self._entries.get((version, key))
+            if entry is not None:
+                if entry[0] is None or entry[0] > time.monotonic():
+                    self._entries.move_to_end((version, key))
+                    self.hits += 1
+                    return entry[1]
+                del self._entries[(version, key)]; self.expirations += 1
+        value = self.backend.get(key, version) if self.backend is not None else None
+        with self._lock:
+            if value is None:
+                self.misses += 1
+                return None
+            self.hits += 1; self.shared_hits += 1
+            self._store((version, key), value)
+        return value
+
+    def put(self, key: str, version: str, value):
+        with self._lock:
+            self._check_version(version)
+            self._store((version, key), value)
+        if self.backend is not None:
+            evicted = self.backend.set(key, version, value)
+            with self._lock:
+                self.shared_evictions += evicted
+
+    def _store(self, key, value):
+        self._entries[key] = (None if self.ttl is None else time.monotonic() + self.ttl, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False); self.evictions += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear(); self._versions.clear()
+        if self.backend is not None:
+            self.backend.clear()
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {"size": len(self._entries), "maxsize": self.maxsize, "hits": self.hits, "misses": self.misses,
+                    "shared_hits": self.shared_hits, "evictions": self.evictions,
+                    "shared_evictions": self.shared_evictions, "expirations": self.expirations,
+                    "invalidations": self.invalidations}
+
+
+def cache_from_env(environ=os.environ) -> Optional[ResultCache]:
+    """Build the default cache from PREDICTION_CACHE_SIZE / _TTL / _PATH (size 0 disables it)."""
+    size = int(environ.get("PREDICTION_CACHE_SIZE", 4096))
+    if size <= 0:
+        return None
+    ttl = float(environ["PREDICTION_CACHE_TTL"]) if environ.get("PREDICTION_CACHE_TTL") else None
+    path = environ.get("PREDICTION_CACHE_PATH")
+    backend = SQLiteBackend(path, maxsize=int(environ.get("PREDICTION_CACHE_SHARED_SIZE", 100_000)), ttl=ttl) if path else None
+    return ResultCache(size, ttl, backend)
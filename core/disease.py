@@ -0,0 +1,188 @@
+# core/disease.py
+import re
+import numpy as np
+import pandas as pd
+
+from core.snapshot import column_values
+
+KMER = 11
+WINDOW_FLANK = 7  # Ochoa sequence windows start 7 residues before the phosphosite
+POSITION_TOLERANCE = 5
+AA_1_TO_3 = {"A":"ALA","R":"ARG","N":"ASN","D":"ASP","C":"CYS","E":"GLU","Q":"GLN","G":"GLY","H":"HIS","I":"ILE",
+             "L":"LEU","K":"LYS","M":"MET","F":"PHE","P":"PRO","S":"SER","T":"THR","W":"TRP","Y":"TYR","V":"VAL"}
+_AA3_CODE = {aa3: i for i, aa3 in enumerate(AA_1_TO_3.values())}
+_PHOSPHOSITE = re.compile(r"([A-Z])(\d+)")
+_MUTATION = re.compile(r"([A-Z]{3})(\d+)([A-Z]{3})")
+
+NO_DATA = "No disease association data available."
+NO_GENE = "No disease association found for the given Gene in Ochoa data."
+NO_SUBSTRATE = "No disease association found for the given 11-letter Substrate in Ochoa data."
+NO_MATCH = "No specific disease association found for this mutation and substrate combination."
+
+
+def _upper_or_empty(values: list) -> list:
+    return [v.upper() if isinstance(v, str) else "" for v in values]
+
+
+def _residue_codes(buf: np.ndarray) -> np.ndarray:
+    # 5 bits per residue: A-Z -> 1..26, '_' padding -> 27, anything else -> 31, end of string -> 0.
+    codes = np.full(buf.shape, 31, dtype=np.int64)
+    letters = (buf >= ord("A")) & (buf <= ord("Z"))
+    codes[letters] = buf[letters] - (ord("A") - 1)
+    codes[buf == ord("_")] = 27
+    codes[buf == 0] = 0
+    return codes
+
+
+def _kmer_code(seq: str) -> int:
+    buf = np.frombuffer(seq.encode("ascii", "replace"), dtype=np.uint8)
+    code = 0
+    for c in _residue_codes(buf).tolist():
+        code = (code << 5) | c
+    return code
+
+
+class DiseaseIndex:
+    """Load-time index answering ``_check_disease_association`` without scanning frames.
+
+    * Ochoa rows sorted by upper-cased gene (gene -> rows),
+    * every 11-mer of every sequence window packed into a 55-bit integer and
+      sorted, so a substrate resolves to ``(row, window offset)`` pairs by
+      binary search,
+    * disease mutations pre-parsed into (gene, position, orig, new) arrays
+      sorted by gene then position, making the +/-5 window a ``searchsorted``.
+
+    All state is plain NumPy arrays so it can live in the reference snapshot.
+    """
+
+    def __init__(self, arrays: dict):
+        self.arrays = arrays
+        for name, arr in arrays.items():
+            setattr(self, name, arr)
+        self.empty = bool(self.empty_flag[0])
+
+    @classmethod
+    def build(cls, ochoa_data, disease_data) -> "DiseaseIndex":
+        # Either table may be a DataFrame or a snapshot's SnapshotFrame; only its columns are read.
+        empty = ochoa_data.empty or disease_data.empty
+        arrays = {"empty_flag": np.array([empty])}
+        arrays.update(cls._ochoa_arrays(pd.DataFrame() if empty else ochoa_data))
+        arrays.update(cls._disease_arrays(pd.DataFrame() if empty else disease_data))
+        return cls(arrays)
+
+    @staticmethod
+    def _ochoa_arrays(ochoa) -> dict:
+        n = len(ochoa)
+        gene_values = column_values(ochoa, "Gene") if n else []
+        genes = _upper_or_empty(gene_values)
+        windows = _upper_or_empty(column_values(ochoa, "sequence_window")) if n else []
+        phos_pos = np.full(n, -1, dtype=np.int64)
+        for i, site in enumerate(column_values(ochoa, "Phosphosite") if n else []):
+            m = _PHOSPHOSITE.match(str(site).upper())
+            if m:
+                phos_pos[i] = int(m.group(2))
+
+        # Rows whose Gene is not a string never match, as with ``.str.upper() == gene``.
+        named = np.array([isinstance(g, str) for g in gene_values], dtype=bool)
+        gene_arr = np.array(genes, dtype=str) if n else np.zeros(0, dtype="U1")
+        gene_rows = np.flatnonzero(named)[np.argsort(gene_arr[named], kind="stable")]
+        window_arr = np.array([w.encode("ascii", "replace") for w in windows], dtype=bytes) if n else np.zeros(0, dtype="S1")
+
+        width = window_arr.dtype.itemsize
+        kmer_code = np.zeros(0, dtype=np.int64); kmer_row = np.zeros(0, dtype=np.int64); kmer_offset = np.zeros(0, dtype=np.int64)
+        if n and width >= KMER:
+            codes = _residue_codes(window_arr.view(np.uint8).reshape(n, width))
+            n_off = width - KMER + 1
+            kmers = np.zeros((n, n_off), dtype=np.int64)
+            valid = np.ones((n, n_off), dtype=bool)
+            for j in range(KMER):
+                part = codes[:, j:j + n_off]
+                kmers = (kmers << 5) | part
+                valid &= part != 0
+            rows, offsets = np.nonzero(valid)
+            kmers = kmers[rows, offsets]
+            # Sort by (code, row, offset) and keep each row's first offset, mirroring str.find.
+            order = np.lexsort((offsets, rows, kmers))
+            kmers, rows, offsets = kmers[order], rows[order], offsets[order]
+            first = np.ones(len(kmers), dtype=bool)
+            first[1:] = (kmers[1:] != kmers[:-1]) | (rows[1:] != rows[:-1])
+            kmer_code, kmer_row, kmer_offset = kmers[first], rows[first], offsets[first]
+
+        return {
+            "ochoa_window": window_arr, "ochoa_phos_pos": phos_pos,
+            "gene_sorted": gene_arr[gene_rows], "gene_rows": gene_rows,
+            "kmer_code": kmer_code, "kmer_row": kmer_row, "kmer_offset": kmer_offset,
+        }
+
+    @staticmethod
+    def _disease_arrays(disease) -> dict:
+        genes, positions, origs, news, entries = [], [], [], [], []
+        if len(disease):
+            phenotypes = column_values(disease, "Phenotype") if "Phenotype" in disease.columns else [""] * len(disease)
+            for gene, mutation, phenotype in zip(column_values(disease, "Gene"), column_values(disease, "Mutation"), phenotypes):
+                mutation = str(mutation).upper()
+                m = _MUTATION.match(mutation)
+                if not isinstance(gene, str) or not m:
+                    continue
+                genes.append(gene.upper()); positions.append(int(m.group(2)))
+                origs.append(_AA3_CODE.get(m.group(1), -1)); news.append(_AA3_CODE.get(m.group(3), -1))
+                entries.append(f"  - Phenotype: {phenotype} (Mutation: {mutation})")
+        gene_arr = np.array(genes, dtype=str) if genes else np.zeros(0, dtype="U1")
+        pos_arr = np.array(positions, dtype=np.int64)
+        order = np.lexsort((np.arange(len(genes)), pos_arr, gene_arr)) if genes else np.zeros(0, dtype=np.int64)
+        return {
+            "disease_gene": gene_arr[order], "disease_pos": pos_arr[order],
+            "disease_orig": np.array(origs, dtype=np.int8)[order], "disease_new": np.array(news, dtype=np.int8)[order],
+            "disease_row": order.astype(np.int64),
+            "disease_entry": (np.array(entries, dtype=str) if entries else np.zeros(0, dtype="U1"))[order],
+        }
+
+    def _gene_range(self, sorted_genes, gene: str):
+        return np.searchsorted(sorted_genes, gene, "left"), np.searchsorted(sorted_genes, gene, "right")
+
+    def _substrate_hits(self, gene: str, substrate: str, lo: int, hi: int):
+        if len(substrate) == KMER and len(self.kmer_code):
+            code = _kmer_code(substrate)
+            a, b = np.searchsorted(self.kmer_code, code, "left"), np.searchsorted(self.kmer_code, code, "right")
+            rows, offsets = self.kmer_row[a:b], self.kmer_offset[a:b]
+            keep = np.isin(rows, self.gene_rows[lo:hi])
+            needle = substrate.encode("ascii", "replace")
+            # Non A-Z/_ residues share one code, so confirm the actual window text.
+            return [(r, o) for r, o in zip(rows[keep].tolist(), offsets[keep].tolist())
+                    if self.ochoa_window[r][o:o + KMER] == needle]
+        needle = substrate.encode("ascii", "replace")
+        hits = []
+        for r in sorted(self.gene_rows[lo:hi].tolist()):
+            offset = self.ochoa_window[r].find(needle)
+            if offset != -1:
+                hits.append((r, offset))
+        return hits
+
+    def lookup(self, gene_name: str, substrate_sequence: str, mutation_aa_orig: str, mutation_pos_motif: int, mutation_aa_new: str) -> str:
+        if self.empty:
+            return NO_DATA
+        gene, substrate = gene_name.upper(), substrate_sequence.upper()
+        lo, hi = self._gene_range(self.gene_sorted, gene)
+        if lo == hi:
+            return NO_GENE
+        hits = self._substrate_hits(gene, substrate, lo, hi)
+        if not hits:
+            return NO_SUBSTRATE
+
+        orig = _AA3_CODE.get(AA_1_TO_3.get(mutation_aa_orig.upper()), -2)
+        new = _AA3_CODE.get(AA_1_TO_3.get(mutation_aa_new.upper()), -2)
+        d_lo, d_hi = self._gene_range(self.disease_gene, gene)
+        positions = self.disease_pos[d_lo:d_hi]
+        found = {}
+        for row, offset in hits:
+            phos_pos = self.ochoa_phos_pos[row]
+            if phos_pos < 0:
+                continue
+            user_pos = (phos_pos - WINDOW_FLANK) + (offset + (mutation_pos_motif - 1))
+            a = d_lo + np.searchsorted(positions, user_pos - POSITION_TOLERANCE, "left")
+            b = d_lo + np.searchsorted(positions, user_pos + POSITION_TOLERANCE, "right")
+            match = (self.disease_orig[a:b] == orig) & (self.disease_new[a:b] == new)
+            candidates = np.flatnonzero(match) + a
+            for i in candidates[np.argsort(self.disease_row[candidates])].tolist():
+                found.setdefault(str(self.disease_entry[i]), None)
+        return "\n".join(found) if found else NO_MATCH
@@ -0,0 +1,250 @@
+# core/metrics.py
+"""Prometheus metrics for the prediction pipeline.
+
+Each series has a fixed slot in one float64 array per process.  With
+``METRICS_DIR`` set (gunicorn.conf.py gives every server a fresh one) the
+array is a memory-mapped ``<layout>-<pid>.bin`` file in that directory, and
+whichever worker answers ``/metrics`` adds up the files of all workers.
+When a worker exits, the gunicorn master folds its file into
+``<layout>-retired.bin`` (``retire_process``), so counters never go
+backwards but the dead worker is no longer counted as a process.  A
+preloading master retires its own file the same way before it forks.
+Reference-data figures are reported by the answering process; with
+``preload_app`` every worker shares the master's tables anyway.
+
+Stages are timed by wrapping predictor methods once at start-up, as the
+benchmark stage timer does.  With ``METRICS=0`` nothing is wrapped and the
+app registers no hooks, so there is no per-request cost at all.
+"""
+from bisect import bisect_left
+from functools import wraps
+from pathlib import Path
+from typing import Optional
+import hashlib, mmap, os, sys, threading, time
+import numpy as np
+import pandas as pd
+
+from core import result as result_module
+from core.result import ImpactCategory
+
+# Stage name -> predictor method, for the per-call path.
+PREDICT_STAGES = {
+    "validate": "_validate_input", "rng": "_draws_for",
+    "charge": "calculate_charge_impact", "size": "calculate_size_impact",
+    "hydrophobicity": "calculate_hydrophobicity_impact", "polarity": "calculate_polarity_impact",
+    "probability": "calculate_probability_impact", "aromatic": "calculate_aromatic_impact",
+    "disease": "_check_disease_association", "render": "_render_analysis",
+}
+# Whole entry points; predict and batch also count their results by outcome.
+ENTRY_STAGES = {"predict": "predict_mutation_impact", "batch": "predict_batch",
+                "scan": "scan_substrate", "sites": "rank_sites"}
+STAGES = (*PREDICT_STAGES, "html", *ENTRY_STAGES)
+OUTCOMES = {
+    ImpactCategory.HIGH: "high", ImpactCategory.MODERATE: "moderate", ImpactCategory.LOW: "low",
+    ImpactCategory.MINIMAL: "minimal", ImpactCategory.ENHANCEMENT: "enhancement", ImpactCategory.INVALID: "invalid",
+}
+PHOSPHOSITE_LOSS = "phosphosite_loss"  # the S/T/Y short-circuit (category High, no score)
+ENDPOINTS = ("index", "healthz", "api_stats", "api_suggest", "api_predict", "api_predict_batch",
+             "api_scan", "api_sites", "metrics", "other")
+STATUS_CLASSES = ("2xx", "3xx", "4xx", "5xx")
+STAGE_BUCKETS = (1e-5, 2.5e-5, 5e-5, 1e-4, 2.5e-4, 5e-4, 1e-3, 2.5e-3, 5e-3, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+REQUEST_BUCKETS = (1e-4, 2.5e-4, 5e-4, 1e-3, 2.5e-3, 5e-3, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30)
+PREFIX = "kmp"
+RETIRED = "retired"
+_render_html = result_module.render_html
+
+
+def table_size(table) -> tuple:
+    """``(rows, bytes)`` of one reference table."""
+    if isinstance(table, pd.DataFrame):
+        return len(table), int(table.memory_usage(index=True, deep=True).sum())
+    if isinstance(table, dict):
+        sizes = [table_size(t) for t in table.values()]
+        return sum(r for r, _ in sizes), sum(b for _, b in sizes)
+    if hasattr(table, "arrays"):
+        arrays = list(table.arrays.values())
+        return (len(arrays[0]) if arrays else 0), sum(int(a.nbytes) for a in arrays)
+    return len(table), sys.getsizeof(table)
+
+
+def _labels(**labels) -> str:
+    return "{" + ",".join(f'{k}="{v}"' for k, v in labels.items()) + "}"
+
+
+class Metrics:
+    def __init__(self, directory=None):
+        self.directory = Path(directory) if directory else None
+        self.size = 0
+        self.outcomes = self._slots({label: 1 for label in (*OUTCOMES.values(), PHOSPHOSITE_LOSS)})
+        self.stages = self._slots({stage: len(STAGE_BUCKETS) + 3 for stage in STAGES})
+        self.requests = self._slots({endpoint: len(REQUEST_BUCKETS) + 3 for endpoint in ENDPOINTS})
+        self.responses = self._slots({(e, c): 1 for e in ENDPOINTS for c in STATUS_CLASSES})
+        # Files from a build with another slot layout are ignored rather than mis-added.
+        self.layout = hashlib.sha256(repr((self.size, STAGES, ENDPOINTS, STAGE_BUCKETS, REQUEST_BUCKETS)).encode()).hexdigest()[:8]
+        self.predictor = None
+        self._tables = None
+        self._open()
+        # A forked worker must not keep writing into its parent's file.
+        os.register_at_fork(after_in_child=self._open)
+
+    def _slots(self, widths: dict) -> dict:
+        offsets = {}
+        for key, width in widths.items():
+            offsets[key] = self.size
+            self.size += width
+        return offsets
+
+    def _open(self):
+        self._lock = threading.Lock()
+        if self.directory is None:
+            self._values = memoryview(bytearray(8 * self.size)).cast("d")
+            return
+        self.directory.mkdir(parents=True, exist_ok=True)
+        path = self.directory / f"{self.layout}-{os.getpid()}.bin"
+        with open(path, "w+b") as f:
+            f.truncate(8 * self.size)
+            self._mmap = mmap.mmap(f.fileno(), 8 * self.size)
+        self._values = memoryview(self._mmap).cast("d")
+
+    # -- recording -------------------------------------------------------
+
+    def _observe(self, offset: int, bounds: tuple, value: float):
+        bucket, total = offset + bisect_left(bounds, value), offset + len(bounds) + 1
+        with self._lock:
+            values = self._values
+            values[bucket] += 1; values[total] += value; values[total + 1] += 1
+
+    def count(self, results):
+        with self._lock:
+            for r in results:
+                label = PHOSPHOSITE_LOSS if r.score is None and r.category is ImpactCategory.HIGH else OUTCOMES[r.category]
+                self._values[self.outcomes[label]] += 1
+
+    def observe_request(self, endpoint: Optional[str], status: int, seconds: float):
+        endpoint = endpoint if endpoint in self.requests else "other"
+        self._observe(self.requests[endpoint], REQUEST_BUCKETS, seconds)
+        code = STATUS_CLASSES[min(max(status // 100 - 2, 0), 3)]
+        with self._lock:
+            self._values[self.responses[(endpoint, code)]] += 1
+
+    def timed(self, stage: str, fn, many: Optional[bool] = None):
+        """Wrap ``fn`` to time it as ``stage``; ``many`` also counts its result(s) by outcome."""
+        offset, observe, clock = self.stages[stage], self._observe, time.perf_counter
+
+        @wraps(fn)
+        def timed(*args, **kwargs):
+            t0 = clock()
+            try:
+                out = fn(*args, **kwargs)
+            finally:
+                observe(offset, STAGE_BUCKETS, clock() - t0)
+            if many is not None:
+                self.count(out if many else (out,))
+            return out
+        return timed
+
+    def instrument(self, predictor):
+        """Time ``predictor``'s stages and count its outcomes; report its reference data."""
+        for stage, attr in PREDICT_STAGES.items():
+            setattr(predictor, attr, self.timed(stage, getattr(predictor, attr)))
+        for stage, attr in ENTRY_STAGES.items():
+            counts = {"predict": False, "batch": True}.get(stage)
+            setattr(predictor, attr, self.timed(stage, getattr(predictor, attr), counts))
+        result_module.render_html = self.timed("html", _render_html)
+        self.predictor, self._tables = predictor, None
+        return predictor
+
+    # -- exposition ------------------------------------------------------
+
+    def collect(self) -> tuple:
+        """Slot values summed over every process writing to ``directory``, and the process count."""
+        if self.directory is None:
+            return np.frombuffer(self._values, dtype=np.float64).copy(), 1
+        total, processes = np.zeros(self.size), 0
+        for path in self.directory.glob(f"{self.layout}-*.bin"):
+            try:
+                values = np.fromfile(path, dtype=np.float64)
+            except OSError:
+                continue  # removed while listing
+            if len(values) == self.size:
+                total += values; processes += path.stem != f"{self.layout}-{RETIRED}"
+        return total, processes
+
+    def _reference(self) -> dict:
+        # Table sizes are measured once per loaded predictor (deep DataFrame sizes are not free).
+        if self._tables is None and self.predictor is not None:
+            from core.predictor import REFERENCE_TABLES
+            self._tables = {name: table_size(getattr(self.predictor, name)) for name in REFERENCE_TABLES
+                            if hasattr(self.predictor, name)}
+        return self._tables or {}
+
+    def render(self) -> str:
+        values, processes = self.collect()
+        lines = []
+
+        def family(name, kind, help_text):
+            lines.extend((f"# HELP {PREFIX}_{name} {help_text}", f"# TYPE {PREFIX}_{name} {kind}"))
+
+        def histogram(name, label, offsets, bounds):
+            n = len(bounds) + 1
+            for key, offset in offsets.items():
+                counts = np.cumsum(values[offset:offset + n])
+                for bound, c in zip((*(f"{b:g}" for b in bounds), "+Inf"), counts):
+                    lines.append(f"{PREFIX}_{name}_bucket{_labels(**{label: key}, le=bound)} {c:.0f}")
+                lines.append(f"{PREFIX}_{name}_sum{_labels(**{label: key})} {values[offset + n]:.9g}")
+                lines.append(f"{PREFIX}_{name}_count{_labels(**{label: key})} {values[offset + n + 1]:.0f}")
+
+        family("predictions_total", "counter", "Predictions by outcome.")
+        for label, offset in self.outcomes.items():
+            lines.append(f"{PREFIX}_predictions_total{_labels(outcome=label)} {values[offset]:.0f}")
+        family("stage_seconds", "histogram", "Time spent per prediction pipeline stage.")
+        histogram("stage_seconds", "stage", self.stages, STAGE_BUCKETS)
+        family("http_request_seconds", "histogram", "Request handling time by endpoint (streamed bodies excluded).")
+        histogram("http_request_seconds", "endpoint", self.requests, REQUEST_BUCKETS)
+        family("http_responses_total", "counter", "Responses by endpoint and status class.")
+        for (endpoint, code), offset in self.responses.items():
+            if values[offset]:
+                lines.append(f"{PREFIX}_http_responses_total{_labels(endpoint=endpoint, code=code)} {values[offset]:.0f}")
+        family("metrics_processes", "gauge", "Worker processes whose metrics are included.")
+        lines.append(f"{PREFIX}_metrics_processes {processes}")
+
+        predictor = self.predictor
+        if predictor is not None:
+            family("reference_data_info", "gauge", "Active reference data version and scoring scheme.")
+            lines.append(f"{PREFIX}_reference_data_info{_labels(version=predictor.data_version, scheme=predictor.scoring_scheme)} 1")
+            family("reference_load_seconds", "gauge", "Time taken by each reference data loading step.")
+            for step, seconds in getattr(predictor, "load_seconds", {}).items():
+                lines.append(f"{PREFIX}_reference_load_seconds{_labels(step=step)} {seconds:.6g}")
+            tables = self._reference()
+            family("reference_table_rows", "gauge", "Rows (or entries) per reference table.")
+            lines.extend(f"{PREFIX}_reference_table_rows{_labels(table=t)} {rows}" for t, (rows, _) in tables.items())
+            family("reference_table_bytes", "gauge", "In-memory size per reference table.")
+            lines.extend(f"{PREFIX}_reference_table_bytes{_labels(table=t)} {size}" for t, (_, size) in tables.items())
+        return "\n".join(lines) + "\n"
+
+
+def retire_process(directory, pid: int):
+    """Fold the counters of exited process ``pid`` into the retired file of each layout in ``directory``."""
+    for path in Path(directory).glob(f"*-{pid}.bin"):
+        layout = path.stem.rsplit("-", 1)[0]
+        retired = path.with_name(f"{layout}-{RETIRED}.bin")
+        try:
+            values = np.fromfile(path, dtype=np.float64)
+            if retired.exists():
+                previous = np.fromfile(retired, dtype=np.float64)
+                if len(previous) == len(values):
+                    values = values + previous
+            tmp = path.with_suffix(".tmp")
+            values.tofile(tmp)
+            os.replace(tmp, retired)  # scrapes see either the old or the new retired totals, never a partial file
+            path.unlink()
+        except OSError:
+            continue
+
+
+def metrics_from_env(environ=os.environ) -> Optional[Metrics]:
+    """Metrics unless METRICS=0; shared across workers through METRICS_DIR when set."""
+    if environ.get("METRICS", "1") in ("", "0"):
+        return None
+    return Metrics(environ.get("METRICS_DIR") or None)
+
@@ -2,8 +2,18 @@
 from pathlib import Path
 import numpy as np
 import pandas as pd
-import random, hashlib, re
-from typing import Tuple
+import os, random, re, threading, time
+from functools import partial
+from typing import Iterable, List, Optional
+
+from core.disease import DiseaseIndex
+from core.cache import ResultCache, cache_from_env
+from core.batch import BatchScorer, ReplayRNG, AMINO_ACIDS, IMPACT_CATEGORIES, MAX_DRAWS, MAX_THEORETICAL_IMPACT, categorize
+from core.pssm import PSSMTensor
+from core.sites import CENTER, OTHER, SiteIndex
+from core.result import IMPACT_KEYS, ImpactCategory, PredictionResult
+from core.rng import DEFAULT_SCHEME, SCHEMES, key_hash, philox_draws, scheme_uniforms, seed_for
+from core.snapshot import changed_sources, column_values, data_version, fingerprint_sources, load_snapshot, snapshot_lock, write_snapshot
 
 BASE_DIR = Path(__file__).resolve().parent.parent
 DATA = BASE_DIR / "data"
@@ -13,6 +23,8 @@ np.random.seed(SEED)
 random.seed(SEED)
 
 MUTATIONS_FILE     = DATA / "filtered_valid_mutations.xlsx"
+TYROSINE_FILE      = DATA / "Tyrosine.xlsx"
+SERTHR_FILE        = DATA / "SerThr.xlsx"
 KINASE_LIST_FILE   = DATA / "kinase_list.txt"
 GENE_LIST_FILE     = DATA / "gene_list.txt"
 DISEASE_DATA_FILE  = DATA / "Disease_Association_Data.xlsx"
@@ -20,9 +32,48 @@ OCHOA_PART_1       = DATA / "ochoa_part_1.csv"
 OCHOA_PART_2       = DATA / "ochoa_part_2.csv"
 OCHOA_PART_3       = DATA / "ochoa_part_3.csv"
 OCHOA_PART_4       = DATA / "ochoa_part_4.csv"
+SNAPSHOT_DIR       = DATA / "snapshot"
+
+REFERENCE_SOURCES  = [MUTATIONS_FILE, TYROSINE_FILE, SERTHR_FILE, DISEASE_DATA_FILE,
+                      OCHOA_PART_1, OCHOA_PART_2, OCHOA_PART_3, OCHOA_PART_4]
+REFERENCE_TABLES   = {"possible_mutations": "pairs", "tyrosine_matrices": "matrix", "serthr_matrices": "matrix",
+                      "disease_association_data": "frame", "ochoa_data": "frame", "disease_index": "arrays",
+                      "site_index": "arrays"}
+RANK_CHUNK         = 65536
+
+# Markdown skeletons of the analysis text; each converts to HTML once (core.result.render_html).
+ANALYSIS_TEMPLATE  = ("\n\n**Mutation Analysis for {}:**\n\n"
+                      "* **Position {}:** {} → {}\n"
+                      "* **Motif:** `{}`\n\n"
+                      "**Individual Impact Assessments:**\n\n"
+                      "* **Charge:** {}\n"
+                      "* **Size:** {}\n"
+                      "* **Hydrophobicity:** {}\n"
+                      "* **Polarity:** {}\n"
+                      "* **Probability:** {}\n"
+                      "* **Aromatic:** {}\n\n"
+                      "**Total Impact Score:** `{}%`\n\n"
+                      "**Overall Assessment:** `{}`\n\n"
+                      "**Disease Association:**\n{}")
+VALIDATED_TEMPLATE = "The mutation from {} to {} is experimentally validated." + ANALYSIS_TEMPLATE
+NOT_OMIM_TEMPLATE  = "The mutation from {} to {} is not possible as per the experimental data from OMIM." + ANALYSIS_TEMPLATE
+PHOSPHOSITE_LOSS_TEMPLATE = "**Complete loss of phosphorylation capability**\n\n**Disease Association:**\n{}"
+
+
+def _table_sources() -> dict:
+    """Source files each reference table is built from (looked up at call time, like REFERENCE_SOURCES)."""
+    pssm, disease = [TYROSINE_FILE, SERTHR_FILE], [DISEASE_DATA_FILE]
+    ochoa = [OCHOA_PART_1, OCHOA_PART_2, OCHOA_PART_3, OCHOA_PART_4]
+    return {"possible_mutations": [MUTATIONS_FILE], "tyrosine_matrices": pssm, "serthr_matrices": pssm,
+            "disease_association_data": disease, "ochoa_data": ochoa, "disease_index": ochoa + disease,
+            "site_index": ochoa}
 
 class KinaseMutationPredictor:
-    def __init__(self):
+    def __init__(self, use_snapshot: bool = True, cache: Optional[ResultCache] = None, reuse: Optional[dict] = None,
+                 scoring_scheme: str = DEFAULT_SCHEME):
+        if scoring_scheme not in SCHEMES:
+            raise ValueError(f"Unknown scoring scheme {scoring_scheme!r}; expected one of {', '.join(SCHEMES)}.")
+        self.scoring_scheme, self.use_snapshot = scoring_scheme, use_snapshot
         self.aa_properties = {
             'A': {'charge': 0,  'size': 'small',    'hydrophobic': True,  'polar': False, 'aromatic': False},
             'R': {'charge': 1,  'size': 'large',    'hydrophobic': False, 'polar': True,  'aromatic': False},
@@ -46,16 +97,134 @@ class KinaseMutationPredictor:
             'V': {'charge': 0,  'size': 'medium',   'hydrophobic': True,  'polar': False, 'aromatic': False}
         }
         self.size_order = ['smallest', 'small', 'medium', 'large', 'largest']
-        self.possible_mutations = self._load_possible_mutations()
-        self.tyrosine_matrices, self.serthr_matrices = self._load_probability_matrices()
-        self.disease_association_data = self._load_disease_association_data()
-        self.ochoa_data = self._load_ochoa_data()
+        self.data_version = None
+        self.sources = {}  # fingerprint of the reference files the tables were loaded from
+        for name, table in self._load_reference_data(use_snapshot, reuse).items():
+            setattr(self, name, table)
+        self.tyrosine_pssm = PSSMTensor(self.tyrosine_matrices)
+        self.serthr_pssm = PSSMTensor(self.serthr_matrices)
+        self._batch_scorer = None
+        self.cache = cache
 
     @staticmethod
     def _rng_for(*parts) -> np.random.Generator:
-        key   = "||".join(map(str, parts))
-        seed  = int(hashlib.sha256(key.encode()).hexdigest(), 16) % (2**32)
-        return np.random.default_rng(seed)
+        return np.random.default_rng(seed_for(*parts))
+
+    def _draws_for(self, *parts):
+        # Draw source for one mutation under the active scoring scheme; v2 only needs ``uniform``.
+        if self.scoring_scheme == "v2":
+            return ReplayRNG(philox_draws(key_hash("||".join(map(str, parts))), MAX_DRAWS))
+        return self._rng_for(*parts)
+
+    def _uniforms_for(self, keys) -> np.ndarray:
+        """``[n, MAX_DRAWS]`` draws for ``"kinase||motif||position||new_aa"`` keys, as ``_draws_for`` makes them."""
+        return scheme_uniforms(self.scoring_scheme, keys, MAX_DRAWS)
+
+    @property
+    def result_version(self) -> str:
+        """Tag for stored results: the data version, plus the scoring scheme when it is not the default."""
+        if self.scoring_scheme == DEFAULT_SCHEME:
+            return self.data_version
+        return f"{self.data_version}+{self.scoring_scheme}"
+
+    def _load_reference_data(self, use_snapshot: bool, reuse: Optional[dict] = None) -> dict:
+        # Seconds per loading step, kept for /metrics.
+        self.load_seconds = {}
+        if not use_snapshot:
+            tables = self._load_reference_sources(reuse)
+            self.sources = fingerprint_sources(REFERENCE_SOURCES)
+            self.data_version = data_version(self.sources)
+            return tables
+        tables = self._read_snapshot()
+        if tables is not None:
+            return tables
+        with snapshot_lock(SNAPSHOT_DIR):
+            # Another process may have rebuilt the snapshot while we waited for the lock.
+            tables = self._read_snapshot()
+            if tables is not None:
+                return tables
+            tables = self._load_reference_sources(reuse)
+            # Sources changed (or no snapshot yet): recompile so the next boot is fast again.
+            t0 = time.perf_counter()
+            try:
+                manifest = write_snapshot(SNAPSHOT_DIR, REFERENCE_SOURCES, tables, REFERENCE_TABLES)
+                self.data_version, self.sources = manifest["version"], manifest["sources"]
+            except Exception:
+                self.sources = fingerprint_sources(REFERENCE_SOURCES)
+                self.data_version = data_version(self.sources)
+            self.load_seconds["snapshot_write"] = time.perf_counter() - t0
+        return tables
+
+    def _read_snapshot(self) -> Optional[dict]:
+        t0 = time.perf_counter()
+        loaded = load_snapshot(SNAPSHOT_DIR, REFERENCE_SOURCES)
+        if loaded is None:
+            return None
+        tables, manifest = loaded
+        tables["disease_index"] = DiseaseIndex(tables["disease_index"])
+        tables["site_index"] = SiteIndex(tables["site_index"])
+        self.data_version, self.sources = manifest["version"], manifest["sources"]
+        self.load_seconds["snapshot_read"] = time.perf_counter() - t0
+        return tables
+
+    def _load_reference_sources(self, reuse: Optional[dict] = None) -> dict:
+        seconds = self.__dict__.setdefault("load_seconds", {})
+        reuse = reuse or {}
+
+        def timed(step, load, *args):
+            t0 = time.perf_counter()
+            try:
+                return load(*args)
+            finally:
+                seconds[step] = time.perf_counter() - t0
+
+        def table(name, step, load, *args):
+            return reuse[name] if name in reuse else timed(step, load, *args)
+
+        if "tyrosine_matrices" in reuse and "serthr_matrices" in reuse:
+            tyrosine_matrices, serthr_matrices = reuse["tyrosine_matrices"], reuse["serthr_matrices"]
+        else:
+            tyrosine_matrices, serthr_matrices = timed("pssm_workbooks", self._load_probability_matrices)
+        disease_association_data = table("disease_association_data", "disease_workbook", self._load_disease_association_data)
+        ochoa_data = table("ochoa_data", "ochoa_csv", self._load_ochoa_data)
+        return {
+            "possible_mutations": table("possible_mutations", "possible_mutations", self._load_possible_mutations),
+            "tyrosine_matrices": tyrosine_matrices,
+            "serthr_matrices": serthr_matrices,
+            "disease_association_data": disease_association_data,
+            "ochoa_data": ochoa_data,
+            "disease_index": table("disease_index", "disease_index", DiseaseIndex.build, ochoa_data, disease_association_data),
+            "site_index": table("site_index", "site_index", SiteIndex.build, ochoa_data),
+        }
+
+    def changed_sources(self) -> set:
+        """Names of the reference files that changed since this predictor's tables were loaded."""
+        changed = changed_sources(self.sources, REFERENCE_SOURCES)
+        # Remember touched-but-identical files so the next check does not hash them again.
+        for path in REFERENCE_SOURCES:
+            entry = self.sources.get(path.name)
+            if path.name not in changed and entry is not None and path.exists():
+                entry["mtime_ns"] = path.stat().st_mtime_ns
+        return changed
+
+    def reload(self) -> Optional["KinaseMutationPredictor"]:
+        """Return a new predictor over the changed reference files, or ``None`` if nothing changed.
+
+        Only the tables built from a changed file are re-read; the others are
+        shared with this predictor, which is left untouched so requests still
+        holding it finish on the old data.
+        """
+        changed = self.changed_sources()
+        if not changed:
+            return None
+        reuse = {name: getattr(self, name) for name, files in _table_sources().items()
+                 if not changed & {Path(f).name for f in files}}
+        return type(self)(self.use_snapshot, self.cache, reuse, self.scoring_scheme)
+
+    @classmethod
+    def build_snapshot(cls, snapshot_dir=SNAPSHOT_DIR) -> dict:
+        tables = cls.__new__(cls)._load_reference_sources()
+        return write_snapshot(snapshot_dir, REFERENCE_SOURCES, tables, REFERENCE_TABLES)
 
     def _load_possible_mutations(self) -> set:
         mutations_set = set()
@@ -89,9 +258,9 @@ class KinaseMutationPredictor:
 
     def _load_probability_matrices(self):
         try:
-            tyrosine_df = pd.read_excel(DATA / "Tyrosine.xlsx",
+            tyrosine_df = pd.read_excel(TYROSINE_FILE,
                                         sheet_name="tyrosine_all_norm_matrices", index_col=0)
-            serthr_df   = pd.read_excel(DATA / "SerThr.xlsx",
+            serthr_df   = pd.read_excel(SERTHR_FILE,
                                         sheet_name="ser_thr_all_norm_matrices", index_col=0)
             return tyrosine_df, serthr_df
         except Exception:
@@ -213,10 +382,10 @@ class KinaseMutationPredictor:
     def calculate_probability_impact(self, kinase_name, original_aa, mutated_aa, position, motif, rng):
         center_aa_index = 5
         center_aa = motif[center_aa_index]
-        matrix = self.tyrosine_matrices if center_aa == 'Y' else self.serthr_matrices
+        pssm = self.tyrosine_pssm if center_aa == 'Y' else self.serthr_pssm
         relative_position = position - center_aa_index
-        prob_original = self.get_probability(kinase_name, original_aa, relative_position, matrix)
-        prob_mutated  = self.get_probability(kinase_name, mutated_aa, relative_position, matrix)
+        prob_original = pssm.lookup(kinase_name, original_aa, relative_position)
+        prob_mutated  = pssm.lookup(kinase_name, mutated_aa, relative_position)
         impact, txt = 0.0, "No significant probability change."
         if prob_original > 0 and prob_mutated > 0:
             ratio = (prob_mutated / prob_original) if prob_original else 0
@@ -247,66 +416,64 @@ class KinaseMutationPredictor:
         return impact * w, txt
 
     def _check_disease_association(self, gene_name: str, substrate_sequence: str, mutation_aa_orig: str, mutation_pos_motif: int, mutation_aa_new: str) -> str:
-        if self.ochoa_data.empty or self.disease_association_data.empty:
-            return "No disease association data available."
-        ochoa_gene_match = self.ochoa_data[self.ochoa_data["Gene"].str.upper() == gene_name.upper()]
-        if ochoa_gene_match.empty:
-            return "No disease association found for the given Gene in Ochoa data."
-        ochoa_seq_match = ochoa_gene_match[ochoa_gene_match["sequence_window"].str.upper().str.contains(substrate_sequence.upper(), regex=False)]
-        if ochoa_seq_match.empty:
-            return "No disease association found for the given 11-letter Substrate in Ochoa data."
-
-        found_associations = []
-        for _, ochoa_row in ochoa_seq_match.iterrows():
-            ochoa_phosphosite_str = str(ochoa_row["Phosphosite"])
-            ochoa_gene = ochoa_row["Gene"]
-            ochoa_sequence_window = str(ochoa_row["sequence_window"]).upper()
-            phos_match = re.match(r"([A-Z])(\d+)", ochoa_phosphosite_str.upper())
-            if not phos_match:
-                continue
-            _, phos_abs_pos = phos_match.groups()
-            phos_abs_pos = int(phos_abs_pos)
-            substrate_start_in_ochoa_window = ochoa_sequence_window.find(substrate_sequence.upper())
-            if substrate_start_in_ochoa_window == -1:
-                continue
-            user_abs_mutation_pos = (phos_abs_pos - 7) + (substrate_start_in_ochoa_window + (mutation_pos_motif - 1))
-            aa_map_1_to_3 = {"A":"ALA","R":"ARG","N":"ASN","D":"ASP","C":"CYS","E":"GLU","Q":"GLN","G":"GLY","H":"HIS","I":"ILE","L":"LEU","K":"LYS","M":"MET","F":"PHE","P":"PRO","S":"SER","T":"THR","W":"TRP","Y":"TYR","V":"VAL"}
-            user_orig_aa_3 = aa_map_1_to_3.get(mutation_aa_orig.upper()); user_new_aa_3 = aa_map_1_to_3.get(mutation_aa_new.upper())
-            disease_matches = self.disease_association_data[self.disease_association_data["Gene"].str.upper() == ochoa_gene.upper()]
-            for _, disease_row in disease_matches.iterrows():
-                disease_mutation = str(disease_row["Mutation"]).upper()
-                disease_phenotype = disease_row.get("Phenotype", "")
-                disease_mut_match = re.match(r"([A-Z]{3})(\d+)([A-Z]{3})", disease_mutation)
-                if disease_mut_match:
-                    disease_orig_aa_3, disease_pos, disease_new_aa_3 = disease_mut_match.groups()
-                    disease_pos = int(disease_pos)
-                    if abs(user_abs_mutation_pos - disease_pos) <= 5:
-                        if user_orig_aa_3 == disease_orig_aa_3 and user_new_aa_3 == disease_new_aa_3:
-                            entry = f"  - Phenotype: {disease_phenotype} (Mutation: {disease_mutation})"
-                            if entry not in found_associations:
-                                found_associations.append(entry)
-        return "\n".join(found_associations) if found_associations else "No specific disease association found for this mutation and substrate combination."
-
-    def predict_mutation_impact(self, kinase_name: str, gene_name: str, motif: str, position: int, original_aa: str, new_aa: str) -> Tuple[str, str]:
+        return self.disease_index.lookup(gene_name, substrate_sequence, mutation_aa_orig, mutation_pos_motif, mutation_aa_new)
+
+    def _validate_input(self, motif: str, position: int, original_aa: str, new_aa: str) -> Optional[PredictionResult]:
         if len(motif) != 11:
-            return "Invalid Input", "Error: Motif must be exactly 11 amino acids long."
+            return PredictionResult.invalid("Error: Motif must be exactly 11 amino acids long.")
         if position < 0 or position >= 11:
-            return "Invalid Input", "Error: Position must be between 0 and 10."
+            return PredictionResult.invalid("Error: Position must be between 0 and 10.")
         if motif[position] != original_aa:
-            return "Invalid Input", f"Error: Position {position+1} in motif is {motif[position]}, not {original_aa}."
+            return PredictionResult.invalid(f"Error: Position {position+1} in motif is {motif[position]}, not {original_aa}.")
+        if original_aa not in self.aa_properties or new_aa not in self.aa_properties:
+            return PredictionResult.invalid(f"Error: Unknown amino acid in {original_aa} → {new_aa}.")
+        return None
 
-        if position == 5 and original_aa in ['S', 'T', 'Y'] and new_aa not in ['S', 'T', 'Y']:
-            disease_association = self._check_disease_association(gene_name, motif, original_aa, position + 1, new_aa)
-            detailed = ("**Complete loss of phosphorylation capability**\n\n"
-                        f"**Disease Association:**\n{disease_association}")
-            return "High Impact (Likely Disruptive)", detailed
+    @staticmethod
+    def _is_phosphosite_loss(position: int, original_aa: str, new_aa: str) -> bool:
+        return position == 5 and original_aa in ['S', 'T', 'Y'] and new_aa not in ['S', 'T', 'Y']
 
-        if (original_aa, new_aa) not in self.possible_mutations:
-            detailed_analysis = f"The mutation from {original_aa} to {new_aa} is not possible as per the experimental data from OMIM."
-        else:
-            detailed_analysis = f"The mutation from {original_aa} to {new_aa} is experimentally validated."
+    def _phosphosite_loss(self, gene_name: str, motif: str, position: int, original_aa: str, new_aa: str) -> PredictionResult:
+        return PredictionResult(
+            ImpactCategory.HIGH,
+            _disease=partial(self._check_disease_association, gene_name, motif, original_aa, position + 1, new_aa),
+            _details=lambda result: (PHOSPHOSITE_LOSS_TEMPLATE, (result.disease_association,)))
 
-        rng = self._rng_for(kinase_name, motif, position, new_aa)
+    @staticmethod
+    def _impact_category(normalized_total_impact: float) -> ImpactCategory:
+        if normalized_total_impact >= 70:
+            return ImpactCategory.HIGH
+        elif normalized_total_impact >= 40:
+            return ImpactCategory.MODERATE
+        elif normalized_total_impact >= 10:
+            return ImpactCategory.LOW
+        elif normalized_total_impact >= -10:
+            return ImpactCategory.MINIMAL
+        return ImpactCategory.ENHANCEMENT
+
+    def predict_mutation_impact(self, kinase_name: str, gene_name: str, motif: str, position: int, original_aa: str, new_aa: str) -> PredictionResult:
+        invalid = self._validate_input(motif, position, original_aa, new_aa)
+        if invalid:
+            return invalid
+        if self._is_phosphosite_loss(position, original_aa, new_aa):
+            return self._phosphosite_loss(gene_name, motif, position, original_aa, new_aa)
+        if self.cache is None:
+            rng = self._draws_for(kinase_name, motif, position, new_aa)
+            return self._assess(kinase_name, gene_name, motif, position, original_aa, new_aa, rng)
+        # Everything but the disease lookup depends only on (kinase, motif, position, new_aa).
+        key = f"{kinase_name}||{motif}||{position}||{new_aa}"
+        entry = self.cache.get(key, self.result_version)
+        if entry is None:
+            entry = self._score(kinase_name, motif, position, original_aa, new_aa, self._draws_for(kinase_name, motif, position, new_aa))
+            self.cache.put(key, self.result_version, entry)
+        return self._result(kinase_name, gene_name, motif, position, original_aa, new_aa, *entry)
+
+    def _assess(self, kinase_name, gene_name, motif, position, original_aa, new_aa, rng) -> PredictionResult:
+        return self._result(kinase_name, gene_name, motif, position, original_aa, new_aa,
+                            *self._score(kinase_name, motif, position, original_aa, new_aa, rng))
+
+    def _score(self, kinase_name, motif, position, original_aa, new_aa, rng) -> list:
+        """Return the cacheable ``[score, impacts, texts]`` of a non-short-circuited prediction."""
         charge_impact, charge_txt = self.calculate_charge_impact(original_aa, new_aa, position, rng)
         size_impact, size_txt = self.calculate_size_impact(original_aa, new_aa, position, rng)
         hydrophobicity_impact, hydrophobicity_txt = self.calculate_hydrophobicity_impact(original_aa, new_aa, position, rng)
@@ -314,36 +481,195 @@ class KinaseMutationPredictor:
         probability_impact, probability_txt = self.calculate_probability_impact(kinase_name, original_aa, new_aa, position, motif, rng)
         aromatic_impact, aromatic_txt = self.calculate_aromatic_impact(original_aa, new_aa, position, rng)
 
-        MAX_THEORETICAL_IMPACT = 520.0
         total_impact = charge_impact + size_impact + hydrophobicity_impact + polarity_impact + probability_impact + aromatic_impact
         normalized_total_impact = min(100.0, max(0.0, (total_impact / MAX_THEORETICAL_IMPACT) * 100))
-
-        if normalized_total_impact >= 70:
-            overall_impact = "High Impact (Likely Disruptive)"
-        elif normalized_total_impact >= 40:
-            overall_impact = "Moderate Impact"
-        elif normalized_total_impact >= 10:
-            overall_impact = "Low Impact"
-        elif normalized_total_impact >= -10:
-            overall_impact = "Minimal Impact"
+        impacts = (charge_impact, size_impact, hydrophobicity_impact, polarity_impact, probability_impact, aromatic_impact)
+        texts = [charge_txt, size_txt, hydrophobicity_txt, polarity_txt, probability_txt, aromatic_txt]
+        return [float(normalized_total_impact), {k: float(v) for k, v in zip(IMPACT_KEYS, impacts)}, texts]
+
+    def _result(self, kinase_name, gene_name, motif, position, original_aa, new_aa, score, impacts, texts) -> PredictionResult:
+        return PredictionResult(
+            self._impact_category(score), score, impacts,
+            _disease=partial(self._check_disease_association, gene_name, motif, original_aa, position + 1, new_aa),
+            _details=partial(self._render_analysis, kinase_name, motif, position, original_aa, new_aa, texts))
+
+    def _render_analysis(self, kinase_name, motif, position, original_aa, new_aa, texts, result) -> tuple:
+        template = VALIDATED_TEMPLATE if (original_aa, new_aa) in self.possible_mutations else NOT_OMIM_TEMPLATE
+        return template, (original_aa, new_aa, kinase_name, str(position + 1), original_aa, new_aa, motif, *texts,
+                          f"{result.score:.1f}", result.overall, result.disease_association)
+
+    def _replay_analysis(self, row, draws, result) -> tuple:
+        return self._assess(*row, ReplayRNG(draws))._details(result)
+
+    def predict_batch(self, mutations: Iterable) -> List[PredictionResult]:
+        """Score many ``(kinase_name, gene_name, motif, position, original_aa, new_aa)`` rows at once.
+
+        Rows may also be dicts keyed by those argument names.  Results match
+        ``predict_mutation_impact`` row for row; the analysis text of a row is
+        only generated (by replaying its draws) if its ``markdown`` is read.
+        """
+        fields = ("kinase_name", "gene_name", "motif", "position", "original_aa", "new_aa")
+        rows = [tuple(m[f] for f in fields) if isinstance(m, dict) else tuple(m) for m in mutations]
+        results: List[Optional[PredictionResult]] = [None] * len(rows)
+        scored = []
+        for i, (kinase_name, gene_name, motif, position, original_aa, new_aa) in enumerate(rows):
+            invalid = self._validate_input(motif, position, original_aa, new_aa)
+            if invalid:
+                results[i] = invalid
+            elif self._is_phosphosite_loss(position, original_aa, new_aa):
+                results[i] = self._phosphosite_loss(gene_name, motif, position, original_aa, new_aa)
+            else:
+                scored.append(i)
+        if not scored:
+            return results
+
+        cols = list(zip(*(rows[i] for i in scored)))
+        uniforms = self._uniforms_for(["||".join(map(str, (rows[i][0], rows[i][2], rows[i][3], rows[i][5]))) for i in scored])
+        scores = self._scorer().score(cols[0], cols[2], cols[3], cols[4], cols[5], uniforms)
+        impacts = [scores[k].tolist() for k in IMPACT_KEYS]
+        totals = scores["total"].tolist()
+        for j, i in enumerate(scored):
+            kinase_name, gene_name, motif, position, original_aa, new_aa = rows[i]
+            results[i] = PredictionResult(
+                self._impact_category(totals[j]), totals[j], {k: v[j] for k, v in zip(IMPACT_KEYS, impacts)},
+                _disease=partial(self._check_disease_association, gene_name, motif, original_aa, position + 1, new_aa),
+                _details=partial(self._replay_analysis, rows[i], uniforms[j]))
+        return results
+
+    def _scorer(self) -> BatchScorer:
+        if self._batch_scorer is None:
+            self._batch_scorer = BatchScorer(self)
+        return self._batch_scorer
+
+    def scan_substrate(self, motif: str, kinases: Optional[List[str]] = None) -> dict:
+        """Saturation mutagenesis: every position x amino acid x kinase for one 11-mer.
+
+        Returns the normalized impact cube ``scores`` (float64, shape
+        ``[11, 20, len(kinases)]``, amino acids in ``AMINO_ACIDS`` order) and
+        ``categories`` (uint8 indexes into ``IMPACT_CATEGORIES``).  Each cell
+        equals ``predict_mutation_impact`` for that substitution; where it
+        short-circuits on loss of the central S/T/Y there is no score, so the
+        cell is NaN with the "High Impact" category.  ``kinases`` defaults to
+        ``kinase_list.txt`` and must be a subset of it.
+        """
+        motif = motif.upper()
+        if len(motif) != 11 or any(aa not in self.aa_properties for aa in motif):
+            raise ValueError("Motif must be 11 standard amino acids.")
+        known = load_kinase_list()
+        if kinases is None:
+            kinases = known
+        elif not isinstance(kinases, (list, tuple)) or not all(isinstance(k, str) for k in kinases):
+            raise ValueError("Kinases must be a list of kinase names.")
         else:
-            overall_impact = "Potential Enhancement"
-
-        disease_association = self._check_disease_association(gene_name, motif, original_aa, position + 1, new_aa)
-        detailed_analysis += f"\n\n**Mutation Analysis for {kinase_name}:**\n\n"
-        detailed_analysis += f"* **Position {position+1}:** {original_aa} → {new_aa}\n"
-        detailed_analysis += f"* **Motif:** `{motif}`\n\n"
-        detailed_analysis += f"**Individual Impact Assessments:**\n\n"
-        detailed_analysis += f"* **Charge:** {charge_txt}\n"
-        detailed_analysis += f"* **Size:** {size_txt}\n"
-        detailed_analysis += f"* **Hydrophobicity:** {hydrophobicity_txt}\n"
-        detailed_analysis += f"* **Polarity:** {polarity_txt}\n"
-        detailed_analysis += f"* **Probability:** {probability_txt}\n"
-        detailed_analysis += f"* **Aromatic:** {aromatic_txt}\n\n"
-        detailed_analysis += f"**Total Impact Score:** `{normalized_total_impact:.1f}%`\n\n"
-        detailed_analysis += f"**Overall Assessment:** `{overall_impact}`\n\n"
-        detailed_analysis += f"**Disease Association:**\n{disease_association}"
-        return overall_impact, detailed_analysis
+            unknown = sorted(set(kinases) - set(known))
+            if unknown:
+                raise ValueError(f"Unknown kinase(s): {', '.join(unknown[:10])}.")
+            if len(set(kinases)) != len(kinases):
+                raise ValueError("Kinases must not repeat.")
+        kinases = list(kinases)
+        scorer = self._scorer()
+        n_pos, n_aa, n_kin = 11, len(AMINO_ACIDS), len(kinases)
+        pos = np.repeat(np.arange(n_pos), n_aa * n_kin)
+        m = np.tile(np.repeat(np.arange(n_aa), n_kin), n_pos)
+        kin = np.tile(np.arange(n_kin), n_pos * n_aa)
+        o = np.array([scorer.aa_index[aa] for aa in motif])[pos]
+
+        pssm = self.tyrosine_pssm if motif[5] == 'Y' else self.serthr_pssm
+        kinase_ids = np.array([pssm.kinase_id(k) for k in kinases], dtype=np.intp)[kin]
+        residue_ids = pssm.residue_ids(AMINO_ACIDS)
+        p_orig = pssm.gather(kinase_ids, pos, residue_ids[o])
+        p_mut = pssm.gather(kinase_ids, pos, residue_ids[m])
+
+        sty = np.array([aa in 'STY' for aa in AMINO_ACIDS])
+        lost = (pos == 5) & sty[o] & ~sty[m]
+        keys = [f"{k}||{motif}||{p}||{aa}" for p in range(n_pos) for aa in AMINO_ACIDS for k in kinases]
+        scored = np.flatnonzero(~lost)
+        uniforms = self._uniforms_for([keys[i] for i in scored])
+        total = np.full(len(pos), np.nan)
+        total[scored] = scorer.score_indexed(pos[scored], o[scored], m[scored], p_orig[scored], p_mut[scored], uniforms)["total"]
+        categories = categorize(total)
+        categories[lost] = IMPACT_CATEGORIES.index(ImpactCategory.HIGH)
+        shape = (n_pos, n_aa, n_kin)
+        return {"motif": motif, "kinases": kinases, "amino_acids": AMINO_ACIDS,
+                "scores": total.reshape(shape), "categories": categories.reshape(shape)}
+
+    def _site_query(self, kinase_name: str, offset: int, new_aa: str, original_aa: Optional[str]):
+        new_aa = (new_aa or "").upper(); original_aa = (original_aa or "").upper() or None
+        if not (kinase_name in self.serthr_pssm.kinase_index or kinase_name in self.tyrosine_pssm.kinase_index):
+            raise ValueError(f"Unknown kinase: {kinase_name}.")
+        if not (isinstance(offset, int) and -CENTER <= offset <= CENTER and offset != 0):
+            raise ValueError("Offset must be between -5 and +5, excluding the phosphosite itself (0).")
+        if new_aa not in AMINO_ACIDS or (original_aa is not None and original_aa not in AMINO_ACIDS):
+            raise ValueError("Residues must be standard amino acids.")
+        if original_aa == new_aa:
+            raise ValueError("Original and new residue are the same.")
+        column = self.site_index.site_residue[:, CENTER + offset]
+        new_id = AMINO_ACIDS.index(new_aa)
+        mask = (column == AMINO_ACIDS.index(original_aa)) if original_aa else (column != OTHER) & (column != new_id)
+        return new_aa, original_aa, np.flatnonzero(mask)
+
+    def iter_site_impacts(self, kinase_name: str, offset: int, new_aa: str, original_aa: Optional[str] = None,
+                          chunk_size: int = RANK_CHUNK):
+        """Yield ``(site_ids, scores)`` array chunks for every Ochoa site the substitution applies to.
+
+        ``offset`` is relative to the phosphosite (-5..+5, not 0).  A site's
+        score is exactly ``predict_mutation_impact(kinase_name, gene, motif,
+        5 + offset, motif[5 + offset], new_aa).score`` for its centred 11-mer.
+        """
+        new_aa, _, candidates = self._site_query(kinase_name, offset, new_aa, original_aa)
+        sites, scorer, position = self.site_index, self._scorer(), CENTER + offset
+        m = scorer.aa_index[new_aa]
+        tyrosine = AMINO_ACIDS.index('Y')
+        prefix, suffix = (np.frombuffer(part.encode(), np.uint8) for part in (f"{kinase_name}||", f"||{position}||{new_aa}"))
+        for start in range(0, len(candidates), chunk_size):
+            ids = candidates[start:start + chunk_size]
+            residues = sites.site_residue[ids]
+            o = residues[:, position].astype(np.intp)
+            pos = np.full(len(ids), position, dtype=np.intp)
+            p_orig = np.zeros(len(ids)); p_mut = np.zeros(len(ids))
+            for is_tyr, pssm in ((False, self.serthr_pssm), (True, self.tyrosine_pssm)):
+                rows = np.flatnonzero((residues[:, CENTER] == tyrosine) == is_tyr)
+                kin = np.full(len(rows), pssm.kinase_id(kinase_name), dtype=np.intp)
+                residue_ids = pssm.residue_ids(AMINO_ACIDS)
+                p_orig[rows] = pssm.gather(kin, pos[rows], residue_ids[o[rows]])
+                p_mut[rows] = pssm.gather(kin, pos[rows], np.full(len(rows), residue_ids[m]))
+            # The per-site keys as one bytes array: prefix + motif + suffix.
+            key_bytes = np.concatenate([np.broadcast_to(prefix, (len(ids), len(prefix))),
+                                        sites.site_motif[ids].view(np.uint8).reshape(len(ids), -1),
+                                        np.broadcast_to(suffix, (len(ids), len(suffix)))], axis=1)
+            total = scorer.score_indexed(pos, o, np.full(len(ids), m, dtype=np.intp), p_orig, p_mut,
+                                         self._uniforms_for(key_bytes.view(f"S{key_bytes.shape[1]}").ravel()))["total"]
+            yield ids, total
+
+    def rank_sites(self, kinase_name: str, offset: int, new_aa: str, original_aa: Optional[str] = None,
+                   top_k: int = 50, chunk_size: int = RANK_CHUNK) -> dict:
+        """Reverse query: the ``top_k`` Ochoa phosphosites a substitution disrupts most for one kinase.
+
+        Every site whose residue at ``offset`` is ``original_aa`` (any residue
+        other than ``new_aa`` when omitted) is scored in vectorized chunks;
+        only the running top ``top_k`` are kept, so memory does not grow with
+        the proteome.  Sites are ordered by score, then Ochoa row.
+        """
+        new_aa, original_aa, candidates = self._site_query(kinase_name, offset, new_aa, original_aa)
+        best_ids, best_scores = np.zeros(0, dtype=np.int64), np.zeros(0)
+        for ids, scores in self.iter_site_impacts(kinase_name, offset, new_aa, original_aa, chunk_size):
+            best_ids, best_scores = np.concatenate([best_ids, ids]), np.concatenate([best_scores, scores])
+            keep = np.lexsort((best_ids, -best_scores))[:top_k]
+            best_ids, best_scores = best_ids[keep], best_scores[keep]
+        sites, position = self.site_index, CENTER + offset
+        rows = sites.site_row[best_ids]
+        genes = column_values(self.ochoa_data, "Gene", rows) if len(rows) else []
+        phosphosites = column_values(self.ochoa_data, "Phosphosite", rows) if len(rows) else []
+        categories = categorize(best_scores)
+        return {
+            "kinase": kinase_name, "offset": offset, "original_aa": original_aa, "new_aa": new_aa,
+            "scanned": len(sites), "matched": len(candidates),
+            "sites": [{"gene": None if not isinstance(gene, str) else gene, "phosphosite": str(site), "ochoa_row": int(row),
+                       "motif": motif.decode(), "position": position + 1, "original_aa": motif.decode()[position],
+                       "score": float(score), "overall": IMPACT_CATEGORIES[cat].value}
+                      for gene, site, row, motif, score, cat in zip(genes, phosphosites, rows, sites.site_motif[best_ids],
+                                                                    best_scores, categories)],
+        }
 
 def load_kinase_list() -> list:
     try:
@@ -359,11 +685,67 @@ def load_gene_list() -> list:
     except Exception:
         return []
 
+_predictor = None
+_predictor_lock = threading.Lock()
+
+def get_predictor() -> KinaseMutationPredictor:
+    """Process-wide predictor, loaded on first use.
+
+    Under gunicorn with ``preload_app`` this runs in the master before the
+    workers fork, so every worker shares the loaded tables copy-on-write.
+    Results are cached as configured by the ``PREDICTION_CACHE_*`` variables
+    (see ``core.cache.cache_from_env``); ``SCORING_SCHEME=v2`` opts into the
+    Philox-based scoring scheme (see ``core.rng``).
+    """
+    global _predictor
+    if _predictor is None:
+        with _predictor_lock:
+            if _predictor is None:
+                _predictor = KinaseMutationPredictor(cache=cache_from_env(),
+                                                     scoring_scheme=os.environ.get("SCORING_SCHEME") or DEFAULT_SCHEME)
+    return _predictor
+
+_reload_lock = threading.Lock()
+
+def reload_predictor(prepare=None) -> Optional[KinaseMutationPredictor]:
+    """Swap in a predictor over the changed reference files; returns it, or ``None`` if none changed.
+
+    ``prepare`` is called with the new predictor before it becomes visible to
+    ``get_predictor``.  The swap is a single reference assignment, so callers
+    that already hold the old predictor keep using it until they are done.
+    """
+    global _predictor
+    with _reload_lock:
+        fresh = get_predictor().reload()
+        if fresh is not None:
+            if prepare is not None:
+                prepare(fresh)
+            _predictor = fresh
+        return fresh
+
+INVALID_POSITION = PredictionResult.invalid("Please ensure substrate and position are valid.")
+
+def mutation_args(kinase, gene, substrate, position, new_aa) -> Optional[tuple]:
+    """Normalize request fields (1-based ``position``) into ``predict_mutation_impact`` arguments.
+
+    Shared by the API and the annotator; returns ``None`` when the substrate
+    or position cannot be used (answer those with ``INVALID_POSITION``).
+    """
+    substrate = (substrate or "").strip().upper()
+    try:
+        position = int(position or 0)
+    except (TypeError, ValueError):
+        return None
+    if not (substrate and 1 <= position <= len(substrate)):
+        return None
+    return ((kinase or "").strip(), (gene or "").strip(), substrate, position - 1, substrate[position - 1],
+            (new_aa or "").strip().upper())
+
 # Convenience function for the API
 def predict_once(kinase: str, gene: str, substrate: str, mutation_pos_1based: int, new_aa: str):
-    predictor = KinaseMutationPredictor()
     if not substrate or not (1 <= mutation_pos_1based <= len(substrate)):
-        return "Invalid Input", "Please ensure substrate and position are valid."
+        return INVALID_POSITION
+    predictor = get_predictor()
     pos0 = mutation_pos_1based - 1
     original_aa = substrate[pos0].upper()
     return predictor.predict_mutation_impact(kinase, gene, substrate.upper(), pos0, original_aa, new_aa.upper())
@@ -0,0 +1,51 @@
+# core/pssm.py
+import re
+import numpy as np
+import pandas as pd
+
+CENTER = 5
+N_SLOTS = 11  # motif positions 0..10, i.e. relative positions -5..+5
+_COLUMN = re.compile(r"^(-?\d+)(\w)$")
+
+
+class PSSMTensor:
+    """Dense [kinase x motif position x residue] view of a normalized PSSM workbook.
+
+    Unknown kinases/residues map to index -1, which addresses a trailing zero
+    row/column, so missing entries read as 0.0 exactly like ``get_probability``.
+    Values stay float64 so formatted probabilities match the DataFrame path.
+    """
+    __slots__ = ("kinases", "residues", "kinase_index", "residue_index", "values")
+
+    def __init__(self, matrix_df: pd.DataFrame, dtype=np.float64):
+        cells = []
+        for col in matrix_df.columns:
+            m = _COLUMN.match(str(col))
+            if m and -CENTER <= int(m.group(1)) < N_SLOTS - CENTER:
+                cells.append((col, int(m.group(1)) + CENTER, m.group(2)))
+        self.kinases = [str(k) for k in matrix_df.index]
+        self.residues = sorted({aa for _, _, aa in cells})
+        self.kinase_index = {k: i for i, k in enumerate(self.kinases)}
+        self.residue_index = {aa: i for i, aa in enumerate(self.residues)}
+
+        self.values = np.zeros((len(self.kinases) + 1, N_SLOTS, len(self.residues) + 1), dtype=dtype)
+        if cells:
+            src = matrix_df[[c for c, _, _ in cells]].to_numpy(dtype=dtype)
+            slots = np.array([s for _, s, _ in cells]); res = np.array([self.residue_index[aa] for _, _, aa in cells])
+            self.values[:len(self.kinases), slots, res] = src
+
+    def kinase_id(self, kinase_name) -> int:
+        return self.kinase_index.get(kinase_name, -1)
+
+    def residue_ids(self, residues) -> np.ndarray:
+        return np.fromiter((self.residue_index.get(aa, -1) for aa in residues), dtype=np.intp, count=len(residues))
+
+    def lookup(self, kinase_name, amino_acid, relative_position) -> float:
+        slot = relative_position + CENTER
+        if not 0 <= slot < N_SLOTS:
+            return 0.0
+        return self.values[self.kinase_index.get(kinase_name, -1), slot, self.residue_index.get(amino_acid, -1)]
+
+    def gather(self, kinase_ids, slots, residue_ids) -> np.ndarray:
+        """Vectorized ``lookup`` over aligned integer index arrays (slot = motif position 0..10)."""
+        return self.values[kinase_ids, slots, residue_ids]
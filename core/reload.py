@@ -0,0 +1,102 @@
+# core/reload.py
+"""Hot reload of the reference data.
+
+``ReferenceReloader.reload`` (behind the admin endpoint, and every
+``interval`` seconds from a polling thread in each worker process) checks
+the reference files.  When one changed, only the tables built from it are
+rebuilt (the first worker to notice recompiles the snapshot, the others map
+it), and the new predictor replaces the old one in a single assignment.
+Requests that already hold the old predictor finish on it; the next request
+sees the new data version.
+
+A rebuild replaces the snapshot's ``manifest.json``, which serves as the
+generation marker shared by all workers: ``follow`` stats it (one syscall,
+run before every request) and reloads this worker when it changed, so a
+reload triggered in one worker reaches the others without any polling.
+"""
+import os, threading, time
+from pathlib import Path
+from typing import Callable, Optional
+
+from core.predictor import SNAPSHOT_DIR, get_predictor, reload_predictor
+from core.snapshot import MANIFEST
+
+
+class ReferenceReloader:
+    def __init__(self, interval: float = 0.0, prepare: Optional[Callable] = None, marker=None):
+        self.interval, self.prepare = interval, prepare
+        self.marker = Path(marker) if marker else None
+        self.checks = self.reloads = self.errors = 0
+        self.last_reload = self.last_error = None
+        self._lock = threading.Lock()
+        self._follow_lock = threading.Lock()
+        self._pid = None
+        self._generation = self._stat_marker()
+
+    def _stat_marker(self):
+        try:
+            st = self.marker.stat()
+        except (AttributeError, OSError):
+            return None
+        return st.st_ino, st.st_mtime_ns, st.st_size
+
+    def follow(self):
+        """Reload if another process replaced the snapshot since this one last looked."""
+        generation = self._stat_marker()
+        if generation == self._generation or not self._follow_lock.acquire(blocking=False):
+            return  # unchanged, or another thread of this worker is already reloading
+        try:
+            self._generation = generation
+            self.reload()
+        except Exception:
+            pass  # counted in stats(); keep serving the current data
+        finally:
+            self._follow_lock.release()
+
+    def ensure_running(self):
+        # Threads do not survive fork, so (re)start the polling thread in each worker process.
+        if self.interval > 0 and self._pid != os.getpid():
+            with self._lock:
+                if self._pid != os.getpid():
+                    threading.Thread(target=self._run, name="reference-watcher", daemon=True).start()
+                    self._pid = os.getpid()
+
+    def reload(self) -> dict:
+        """Check the reference files now; reload and swap if any changed."""
+        with self._lock:
+            self.checks += 1
+        previous = get_predictor()
+        t0 = time.perf_counter()
+        try:
+            fresh = reload_predictor(self.prepare)
+        except Exception as e:
+            with self._lock:
+                self.errors += 1; self.last_error = f"{type(e).__name__}: {e}"
+            raise
+        out = {"reloaded": fresh is not None, "data_version": (fresh or previous).data_version,
+               "previous_version": previous.data_version, "seconds": time.perf_counter() - t0}
+        if fresh is not None:
+            out["rebuilt"] = sorted(fresh.load_seconds)
+            with self._lock:
+                self.reloads += 1; self.last_reload = time.time()
+        # A snapshot this process rebuilt is already loaded here; don't reload again in follow().
+        self._generation = self._stat_marker()
+        return out
+
+    def _run(self):
+        while True:
+            time.sleep(self.interval)
+            try:
+                self.reload()
+            except Exception:
+                pass  # counted in stats(); keep serving the current data
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {"interval": self.interval, "checks": self.checks, "reloads": self.reloads,
+                    "last_reload": self.last_reload, "errors": self.errors, "last_error": self.last_error}
+
+
+def reloader_from_env(prepare: Optional[Callable] = None, environ=os.environ) -> ReferenceReloader:
+    """Reloader following the shared snapshot, and polling every REFERENCE_RELOAD_INTERVAL seconds if set."""
+    return ReferenceReloader(float(environ.get("REFERENCE_RELOAD_INTERVAL") or 0), prepare, SNAPSHOT_DIR / MANIFEST)
@@ -0,0 +1,105 @@
+# core/result.py
+from dataclasses import dataclass, field
+from enum import StrEnum
+from functools import lru_cache
+from html import escape
+from typing import Callable, Dict, Optional, Tuple
+import markdown, re
+
+IMPACT_KEYS = ("charge", "size", "hydrophobicity", "polarity", "probability", "aromatic")
+RESPONSE_FORMATS = ("html", "markdown", "compact")
+_SLOT = "KMPSLOT{}X"  # stands in for a value while a template's skeleton is converted
+_SLOTS = re.compile(r"KMPSLOT(\d+)X")
+
+
+class ImpactCategory(StrEnum):
+    HIGH = "High Impact (Likely Disruptive)"
+    MODERATE = "Moderate Impact"
+    LOW = "Low Impact"
+    MINIMAL = "Minimal Impact"
+    ENHANCEMENT = "Potential Enhancement"
+    INVALID = "Invalid Input"
+
+
+@lru_cache(maxsize=256)
+def _html_skeleton(template: str) -> tuple:
+    # The markdown skeleton of a template converts once; its slots become split points.
+    html = markdown.markdown(template.format(*(_SLOT.format(i) for i in range(template.count("{}")))), extensions=["extra"])
+    pieces = _SLOTS.split(html)
+    return pieces[0::2], [int(i) for i in pieces[1::2]]
+
+
+def render_html(template: str, values: tuple) -> str:
+    """HTML of ``template.format(*values)``; values are inserted as escaped text, never parsed as markdown."""
+    literals, slots = _html_skeleton(template)
+    out = [literals[0]]
+    for slot, literal in zip(slots, literals[1:]):
+        out += (escape(str(values[slot]), quote=False), literal)
+    return "".join(out)
+
+
+@dataclass(slots=True, eq=False)
+class PredictionResult:
+    """Outcome of one prediction; the markdown analysis and disease lookup are built on first access.
+
+    The analysis is a ``(template, values)`` pair: a fixed markdown skeleton
+    with ``{}`` slots and the strings that fill them.  Unpacks as the legacy
+    ``(overall, details_markdown)`` pair.
+    """
+    category: ImpactCategory
+    score: Optional[float] = None  # normalized 0-100; None when invalid or short-circuited
+    impacts: Dict[str, float] = field(default_factory=dict)
+    error: Optional[str] = None
+    _disease: Optional[Callable[[], str]] = field(default=None, repr=False)
+    _details: Optional[Callable[["PredictionResult"], Tuple[str, tuple]]] = field(default=None, repr=False)
+    _disease_text: Optional[str] = field(default=None, repr=False)
+    _parts: Optional[Tuple[str, tuple]] = field(default=None, repr=False)
+
+    @classmethod
+    def invalid(cls, message: str) -> "PredictionResult":
+        return cls(ImpactCategory.INVALID, error=message)
+
+    @property
+    def overall(self) -> str:
+        return self.category.value
+
+    @property
+    def disease_association(self) -> str:
+        if self._disease_text is None:
+            self._disease_text = self._disease() if self._disease else ""
+        return self._disease_text
+
+    @property
+    def disease_hits(self) -> Tuple[str, ...]:
+        return tuple(line[4:] for line in self.disease_association.split("\n") if line.startswith("  - "))
+
+    @property
+    def details(self) -> Tuple[str, tuple]:
+        if self._parts is None:
+            self._parts = ("{}", (self.error,)) if self.error is not None else self._details(self)
+        return self._parts
+
+    @property
+    def markdown(self) -> str:
+        template, values = self.details
+        return template.format(*values)
+
+    def to_html(self) -> str:
+        return render_html(*self.details)
+
+    def to_dict(self, fmt: str = "compact") -> dict:
+        out = {"overall": self.overall, "score": self.score}
+        if fmt == "html":
+            out["details_html"] = self.to_html()
+        elif fmt == "markdown":
+            out["details"] = self.markdown
+        else:
+            out["impacts"] = self.impacts
+            out["disease_hits"] = list(self.disease_hits)
+            if self.error is not None:
+                out["error"] = self.error
+        return out
+
+    def __iter__(self):
+        yield self.overall
+        yield self.markdown
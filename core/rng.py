@@ -0,0 +1,249 @@
+# core/rng.py
+"""Vectorized replica of ``np.random.default_rng(seed).random(n)`` for many seeds.
+
+``KinaseMutationPredictor._rng_for`` seeds a fresh PCG64 generator per
+mutation; constructing it (SeedSequence hashing) costs ~20 us, which
+dominates bulk scoring.  The functions here run numpy's SeedSequence
+entropy mixing and the PCG64 XSL-RR generator on whole arrays of seeds at
+once, producing bit-identical doubles.
+"""
+import hashlib, struct, threading
+import numpy as np
+
+# numpy/random/bit_generator.pyx (SeedSequence)
+_POOL_SIZE = 4
+_INIT_A, _MULT_A = np.uint32(0x43b0d7e5), np.uint32(0x931e8875)
+_INIT_B, _MULT_B = np.uint32(0x8b51f9dd), np.uint32(0x58f38ded)
+_MIX_MULT_L, _MIX_MULT_R = np.uint32(0xca01f9dd), np.uint32(0x4973f715)
+_XSHIFT32 = np.uint32(16)
+
+# numpy/random/src/pcg64 (PCG_DEFAULT_MULTIPLIER_128)
+_MUL_HI, _MUL_LO = np.uint64(2549297995355413924), np.uint64(4865540595714422341)
+_M32, _S32 = np.uint64(0xFFFFFFFF), np.uint64(32)
+_ONE = np.uint64(1)
+
+
+def seed_for(*parts) -> int:
+    return seed_for_key("||".join(map(str, parts)))
+
+
+def seed_for_key(key: str) -> int:
+    # Low 32 bits of the SHA-256 digest, i.e. int(hexdigest, 16) % 2**32.
+    return int.from_bytes(hashlib.sha256(key.encode()).digest()[-4:], "big")
+
+
+def _hash_constants(init, mult, count):
+    consts, h = [], init
+    with np.errstate(over="ignore"):
+        for _ in range(count):
+            consts.append(h); h = np.uint32(h * mult)
+    return consts
+
+
+_HASHMIX_A = _hash_constants(_INIT_A, _MULT_A, 64)
+_HASHMIX_B = _hash_constants(_INIT_B, _MULT_B, 2 * _POOL_SIZE)
+
+
+def _seed_state(seeds: np.ndarray) -> np.ndarray:
+    """SeedSequence(seed).generate_state(4, uint64) for 32-bit seeds, shape (n, 4)."""
+    # hashmix's constant sequence is seed-independent, so walk it explicitly.
+    consts = iter(_HASHMIX_A)
+    def hm(value):
+        c = next(consts)
+        value = value ^ c
+        value = value * np.uint32(c * _MULT_A)
+        return value ^ (value >> _XSHIFT32)
+
+    def mix(x, y):
+        r = _MIX_MULT_L * x - _MIX_MULT_R * y
+        return r ^ (r >> _XSHIFT32)
+
+    with np.errstate(over="ignore"):
+        seeds = seeds.astype(np.uint32)
+        pool = [hm(seeds)] + [hm(np.zeros_like(seeds)) for _ in range(_POOL_SIZE - 1)]
+        for src in range(_POOL_SIZE):
+            for dst in range(_POOL_SIZE):
+                if src != dst:
+                    pool[dst] = mix(pool[dst], hm(pool[src]))
+        words = []
+        for i, c in enumerate(_HASHMIX_B):
+            v = pool[i % _POOL_SIZE] ^ c
+            v = v * np.uint32(c * _MULT_B)
+            words.append(v ^ (v >> _XSHIFT32))
+    w = [word.astype(np.uint64) for word in words]
+    # Little-endian pairs of 32-bit words form each 64-bit word.
+    return np.stack([w[2 * k] | (w[2 * k + 1] << _S32) for k in range(4)], axis=1)
+
+
+def _mulhi(a, b):
+    a0, a1, b0, b1 = a & _M32, a >> _S32, b & _M32, b >> _S32
+    p00, p01, p10, p11 = a0 * b0, a0 * b1, a1 * b0, a1 * b1
+    mid = (p00 >> _S32) + (p01 & _M32) + (p10 & _M32)
+    return p11 + (p01 >> _S32) + (p10 >> _S32) + (mid >> _S32)
+
+
+def _step(hi, lo, inc_hi, inc_lo):
+    # state = state * MULT + inc  (mod 2**128)
+    new_hi = _mulhi(lo, _MUL_LO) + hi * _MUL_LO + lo * _MUL_HI
+    new_lo = lo * _MUL_LO
+    out_lo = new_lo + inc_lo
+    out_hi = new_hi + inc_hi + (out_lo < new_lo).astype(np.uint64)
+    return out_hi, out_lo
+
+
+def pcg64_uniforms(seeds, n: int) -> np.ndarray:
+    """Return ``[np.random.default_rng(s).random(n) for s in seeds]`` as one (len(seeds), n) array."""
+    seeds = np.asarray(seeds, dtype=np.uint64)
+    if len(seeds) == 0:
+        return np.zeros((0, n))
+    with np.errstate(over="ignore"):
+        st = _seed_state(seeds)
+        init_hi, init_lo, seq_hi, seq_lo = st[:, 0], st[:, 1], st[:, 2], st[:, 3]
+        inc_hi = (seq_hi << _ONE) | (seq_lo >> np.uint64(63))
+        inc_lo = (seq_lo << _ONE) | _ONE
+        hi, lo = _step(np.zeros_like(inc_hi), np.zeros_like(inc_lo), inc_hi, inc_lo)
+        lo2 = lo + init_lo
+        hi, lo = hi + init_hi + (lo2 < lo).astype(np.uint64), lo2
+        hi, lo = _step(hi, lo, inc_hi, inc_lo)
+        out = np.empty((len(seeds), n))
+        for j in range(n):
+            hi, lo = _step(hi, lo, inc_hi, inc_lo)
+            x, rot = hi ^ lo, hi >> np.uint64(58)
+            word = (x >> rot) | (x << ((np.uint64(64) - rot) & np.uint64(63)))
+            out[:, j] = (word >> np.uint64(11)) * (1.0 / 9007199254740992.0)
+    return out
+
+
+_verified = None
+# Below this many seeds, numpy's own generators beat the fixed cost of the array pipeline.
+SCALAR_SEEDS = 40
+
+def uniforms_for(seeds, n: int) -> np.ndarray:
+    """``pcg64_uniforms`` guarded by a one-time check against the installed numpy."""
+    global _verified
+    if len(seeds) < SCALAR_SEEDS:
+        return np.array([np.random.default_rng(int(s)).random(n) for s in seeds]).reshape(len(seeds), n)
+    if _verified is None:
+        probe = [0, 1, 42, 2**32 - 1]
+        _verified = np.array_equal(pcg64_uniforms(probe, 3), [np.random.default_rng(s).random(3) for s in probe])
+    if _verified:
+        return pcg64_uniforms(seeds, n)
+    return np.array([np.random.default_rng(int(s)).random(n) for s in seeds]).reshape(len(seeds), n)
+
+
+# ---- scoring scheme v2 ------------------------------------------------------
+# Opt-in alternative to the SHA-256 seed + PCG64 generator above: each
+# "kinase||motif||position||new_aa" key is hashed 8 bytes at a time
+# (key_hash), and the hash is the key of a counter-based Philox4x64-10
+# generator whose draws are exactly ``np.random.Generator(np.random.Philox(
+# key=h)).random(n)``.  Neither step needs per-key Python work in bulk.
+
+SCHEMES = ("v1", "v2")
+DEFAULT_SCHEME = "v1"
+
+_M64 = (1 << 64) - 1
+_HASH_INIT, _HASH_MULT = 0xcbf29ce484222325, 0x100000001b3  # FNV-1a 64 offset basis / prime
+_SPLITMIX_1, _SPLITMIX_2 = 0xbf58476d1ce4e5b9, 0x94d049bb133111eb
+
+# numpy/random/src/philox (Random123 Philox4x64 constants)
+_PHILOX_M0, _PHILOX_M1 = 0xD2E7470EE14C6C93, 0xCA5A826395121157
+_PHILOX_W0, _PHILOX_W1 = np.uint64(0x9E3779B97F4A7C15), np.uint64(0xBB67AE8584CAA73B)
+_PHILOX_ROUNDS = 10
+# Below this many keys, resetting numpy's own Philox per key beats the array pipeline.
+SCALAR_KEYS = 100
+
+
+def key_hash(key: str) -> int:
+    """64-bit hash of ``key``: FNV-style over little-endian 8-byte words, then a splitmix64 finalizer."""
+    data = key.encode()
+    h = _HASH_INIT ^ len(data)
+    data += b"\0" * (-len(data) % 8)
+    for word in struct.unpack(f"<{len(data) >> 3}Q", data):
+        h = ((h ^ word) * _HASH_MULT) & _M64
+        h ^= h >> 29
+    h = ((h ^ (h >> 30)) * _SPLITMIX_1) & _M64
+    h = ((h ^ (h >> 27)) * _SPLITMIX_2) & _M64
+    return h ^ (h >> 31)
+
+
+def key_hashes(keys) -> np.ndarray:
+    """``key_hash`` of many keys (strings or a bytes ``S`` array) as one uint64 array."""
+    keys = np.asarray([k.encode() for k in keys] if len(keys) and isinstance(keys[0], str) else keys, dtype=bytes)
+    if len(keys) == 0:
+        return np.zeros(0, dtype=np.uint64)
+    keys = keys.astype(f"S{-(-keys.dtype.itemsize // 8) * 8}")  # zero-pad to whole words
+    lengths = np.char.str_len(keys).astype(np.uint64)
+    words = keys.view("<u8").reshape(len(keys), -1)
+    n_words = (lengths + np.uint64(7)) // np.uint64(8)
+    with np.errstate(over="ignore"):
+        h = np.uint64(_HASH_INIT) ^ lengths
+        for j in range(words.shape[1]):
+            mixed = (h ^ words[:, j]) * np.uint64(_HASH_MULT)
+            mixed ^= mixed >> np.uint64(29)
+            h = np.where(n_words > j, mixed, h)
+        h = (h ^ (h >> np.uint64(30))) * np.uint64(_SPLITMIX_1)
+        h = (h ^ (h >> np.uint64(27))) * np.uint64(_SPLITMIX_2)
+    return h ^ (h >> np.uint64(31))
+
+
+def _mulhilo(a, m: int):
+    """High and low 64-bit halves of ``a * m`` for a uint64 array and a constant."""
+    m_lo, m_hi = np.uint64(m & 0xFFFFFFFF), np.uint64(m >> 32)
+    a_lo, a_hi = a & _M32, a >> _S32
+    cross_1, cross_2 = a_lo * m_hi, a_hi * m_lo
+    mid = a_lo * m_lo; mid >>= _S32; mid += cross_1 & _M32; mid += cross_2 & _M32
+    hi = a_hi * m_hi; hi += cross_1 >> _S32; hi += cross_2 >> _S32; hi += mid >> _S32
+    return hi, a * np.uint64(m)
+
+
+def philox_uniforms(keys, n: int) -> np.ndarray:
+    """Return ``[Generator(Philox(key=k)).random(n) for k in keys]`` as one (len(keys), n) array."""
+    keys = np.asarray(keys, dtype=np.uint64)
+    blocks = -(-n // 4)
+    # One lane per (key, block); numpy's Philox bumps the counter before each block, so block b encrypts b + 1.
+    k0 = np.repeat(keys, blocks); k1 = np.zeros_like(k0)
+    c0 = np.tile(np.arange(1, blocks + 1, dtype=np.uint64), len(keys)); c1 = c2 = c3 = np.zeros_like(c0)
+    with np.errstate(over="ignore"):
+        for r in range(_PHILOX_ROUNDS):
+            if r:
+                k0 += _PHILOX_W0; k1 += _PHILOX_W1
+            hi0, lo0 = _mulhilo(c0, _PHILOX_M0)
+            hi1, lo1 = _mulhilo(c2, _PHILOX_M1)
+            hi1 ^= c1; hi1 ^= k0; hi0 ^= c3; hi0 ^= k1
+            c0, c1, c2, c3 = hi1, lo1, hi0, lo0
+    words = np.stack([c0, c1, c2, c3], axis=1).reshape(len(keys), 4 * blocks)[:, :n]
+    return (words >> np.uint64(11)) * (1.0 / 9007199254740992.0)
+
+
+_philox = threading.local()
+
+def philox_draws(key: int, n: int) -> list:
+    """``Generator(Philox(key=key)).random(n)`` as a list, reusing one generator per thread."""
+    # Constructing a Philox costs an entropy-seeded SeedSequence; resetting its state does not.
+    gen = getattr(_philox, "gen", None)
+    if gen is None:
+        gen = _philox.gen = np.random.Generator(np.random.Philox(key=0))
+    gen.bit_generator.state = {"bit_generator": "Philox",
+                               "state": {"counter": np.zeros(4, dtype=np.uint64), "key": np.array([key, 0], dtype=np.uint64)},
+                               "buffer": np.zeros(4, dtype=np.uint64), "buffer_pos": 4, "has_uint32": 0, "uinteger": 0}
+    return gen.random(n).tolist()
+
+
+_philox_verified = None
+
+def scheme_uniforms(scheme: str, keys, n: int) -> np.ndarray:
+    """``n`` uniforms per ``"kinase||motif||position||new_aa"`` key (str or bytes) under ``scheme``."""
+    global _philox_verified
+    if scheme == "v1":
+        return uniforms_for([seed_for_key(k if isinstance(k, str) else k.decode()) for k in keys], n)
+    if scheme != "v2":
+        raise ValueError(f"Unknown scoring scheme {scheme!r}; expected one of {', '.join(SCHEMES)}.")
+    if len(keys) < SCALAR_KEYS:
+        return np.array([philox_draws(key_hash(k if isinstance(k, str) else k.decode()), n) for k in keys]).reshape(len(keys), n)
+    hashes = key_hashes(keys)
+    if _philox_verified is None:
+        probe = [0, 1, 42, 2**64 - 1]
+        _philox_verified = np.array_equal(philox_uniforms(probe, 5), [philox_draws(k, 5) for k in probe])
+    if _philox_verified:
+        return philox_uniforms(hashes, n)
+    return np.array([philox_draws(int(h), n) for h in hashes]).reshape(len(hashes), n)
@@ -0,0 +1,49 @@
+# core/sites.py
+import numpy as np
+
+from core.batch import AMINO_ACIDS
+from core.disease import KMER, WINDOW_FLANK, _upper_or_empty
+from core.snapshot import column_values
+
+CENTER = 5
+MOTIF_START = WINDOW_FLANK - CENTER  # the 11-mer centred on the phosphosite starts here in the window
+OTHER = len(AMINO_ACIDS)             # residue code for padding ('_') and non-standard letters
+
+_CODE = np.full(256, OTHER, dtype=np.uint8)
+_CODE[np.frombuffer(AMINO_ACIDS.encode(), dtype=np.uint8)] = np.arange(len(AMINO_ACIDS), dtype=np.uint8)
+
+
+class SiteIndex:
+    """Ochoa phosphosites as 11-mer substrates centred on the phosphorylated residue.
+
+    * ``site_row``: Ochoa row of each usable site (window long enough for an 11-mer),
+    * ``site_motif``: the upper-cased 11-mer as fixed-width bytes,
+    * ``site_residue``: ``[n_sites, 11]`` ``AMINO_ACIDS`` indexes (``OTHER`` for padding),
+
+    so a reverse query selects and scores sites with array operations only.
+    Plain NumPy arrays, stored in the reference snapshot like ``DiseaseIndex``.
+    """
+
+    def __init__(self, arrays: dict):
+        self.arrays = arrays
+        for name, arr in arrays.items():
+            setattr(self, name, arr)
+
+    def __len__(self):
+        return len(self.site_row)
+
+    @classmethod
+    def build(cls, ochoa_data) -> "SiteIndex":
+        # ochoa_data is a DataFrame or a snapshot's SnapshotFrame; only sequence_window is read.
+        n = len(ochoa_data) if "sequence_window" in ochoa_data.columns else 0
+        windows = np.array([w.encode("ascii", "replace") for w in _upper_or_empty(column_values(ochoa_data, "sequence_window"))],
+                           dtype=bytes) if n else np.zeros(0, dtype="S1")
+        width = windows.dtype.itemsize
+        if not n or width < MOTIF_START + KMER:
+            return cls({"site_row": np.zeros(0, dtype=np.int64), "site_motif": np.zeros(0, dtype=f"S{KMER}"),
+                        "site_residue": np.zeros((0, KMER), dtype=np.uint8)})
+        buf = windows.view(np.uint8).reshape(n, width)[:, MOTIF_START:MOTIF_START + KMER]
+        usable = np.flatnonzero((buf != 0).all(axis=1))
+        motifs = np.ascontiguousarray(buf[usable])
+        return cls({"site_row": usable.astype(np.int64), "site_motif": motifs.view(f"S{KMER}").ravel(),
+                    "site_residue": _CODE[motifs]})
@@ -0,0 +1,343 @@
+# core/snapshot.py
+"""Compiled, memory-mappable snapshot of the predictor's reference data.
+
+Parsing the Excel workbooks and Ochoa CSVs takes seconds, so the tables are
+compiled once into a directory of ``.npy`` arrays plus a ``manifest.json``
+describing them.  Loading maps the arrays read-only and only rebuilds when
+the source files no longer match the fingerprints recorded in the manifest.
+
+    python -m core.snapshot build     # compile data/ into data/snapshot/
+    python -m core.snapshot verify    # re-check array checksums
+    python -m core.snapshot info      # print the manifest summary
+"""
+from contextlib import contextmanager
+from pathlib import Path
+import argparse, hashlib, json, os, shutil, sys, time
+import numpy as np
+import pandas as pd
+
+try:
+    import fcntl
+except ImportError:  # Windows: rebuilds are not coordinated between processes
+    fcntl = None
+
+SNAPSHOT_FORMAT = 3
+MANIFEST = "manifest.json"
+
+
+def _sha256(path: Path) -> str:
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def fingerprint_sources(sources) -> dict:
+    fp = {}
+    for path in sources:
+        path = Path(path)
+        if path.exists():
+            st = path.stat()
+            fp[path.name] = {"size": st.st_size, "mtime_ns": st.st_mtime_ns, "sha256": _sha256(path)}
+        else:
+            fp[path.name] = None
+    return fp
+
+
+def data_version(fingerprint: dict) -> str:
+    key = "||".join(f"{name}:{(entry or {}).get('sha256', '-')}" for name, entry in sorted(fingerprint.items()))
+    return hashlib.sha256(key.encode()).hexdigest()[:12]
+
+
+def changed_sources(recorded: dict, sources) -> set:
+    """Names of the ``sources`` whose content no longer matches the ``recorded`` fingerprint."""
+    names = {Path(p).name for p in sources}
+    changed = set(recorded) ^ names
+    for path in sources:
+        path = Path(path); entry = recorded.get(path.name)
+        if path.name in changed:
+            continue
+        if not path.exists() or entry is None:
+            if path.exists() or entry is not None:
+                changed.add(path.name)
+            continue
+        st = path.stat()
+        if st.st_size != entry["size"]:
+            changed.add(path.name)
+        # A touched-but-identical file (fresh checkout, copy) still matches on content.
+        elif st.st_mtime_ns != entry["mtime_ns"] and _sha256(path) != entry["sha256"]:
+            changed.add(path.name)
+    return changed
+
+
+def sources_match(manifest: dict, sources) -> bool:
+    return not changed_sources(manifest.get("sources", {}), sources)
+
+
+@contextmanager
+def snapshot_lock(snapshot_dir):
+    """Serialize snapshot rebuilds between processes.
+
+    A no-op where ``fcntl`` is unavailable or the lock file cannot be created
+    (a read-only data directory), in which case the rebuild is not coordinated.
+    """
+    path = Path(snapshot_dir).with_name(f"{Path(snapshot_dir).name}.lock")
+    try:
+        f = open(path, "a") if fcntl is not None else None
+    except OSError:
+        f = None
+    if f is None:
+        yield
+        return
+    with f:
+        fcntl.flock(f, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(f, fcntl.LOCK_UN)
+
+
+# ---- frames ---------------------------------------------------------------
+
+class SnapshotFrame:
+    """A ``frame`` table as its snapshot columns, without building a DataFrame.
+
+    Numeric columns are the mapped arrays; string columns stay mapped
+    fixed-width ``U`` arrays (``""`` where missing, with a null mask), so
+    opening even a large Ochoa table costs nothing per row.  ``take`` reads
+    column values straight from the arrays.  ``frame``, and any other
+    DataFrame attribute or ``table[column]``, builds the pandas DataFrame
+    (object strings, NaN for missing values) on first use.
+    """
+
+    def __init__(self, arrays: dict, nulls: dict, rows: int):
+        self.arrays, self.nulls, self.rows = arrays, nulls, rows
+        self.columns = list(arrays)
+        self._frame = None
+
+    def __len__(self):
+        return self.rows
+
+    @property
+    def empty(self) -> bool:
+        return not self.rows or not self.columns
+
+    def take(self, name: str, rows=None) -> list:
+        """Values of column ``name`` (at ``rows``, default all) as a list; missing strings are NaN."""
+        arr, null = self.arrays[name], self.nulls.get(name)
+        values = (arr if rows is None else arr[rows]).tolist()
+        if null is not None:
+            for i in np.flatnonzero(null if rows is None else null[rows]).tolist():
+                values[i] = np.nan
+        return values
+
+    @property
+    def frame(self) -> pd.DataFrame:
+        if self._frame is None:
+            data = {}
+            for name, arr in self.arrays.items():
+                if arr.dtype.kind == "U":
+                    arr = arr.astype(object)
+                    if name in self.nulls:
+                        arr[self.nulls[name]] = np.nan
+                data[name] = arr
+            self._frame = pd.DataFrame(data, columns=self.columns) if data else pd.DataFrame()
+        return self._frame
+
+    def __getitem__(self, key):
+        return self.frame[key]
+
+    def __getattr__(self, name):
+        if name.startswith("_"):
+            raise AttributeError(name)
+        return getattr(self.frame, name)
+
+
+def column_values(table, name: str, rows=None) -> list:
+    """Column ``name`` of a DataFrame or ``SnapshotFrame`` (at ``rows``, default all) as a list."""
+    if isinstance(table, SnapshotFrame):
+        return table.take(name, rows)
+    values = table[name].to_numpy()
+    return (values if rows is None else values[rows]).tolist()
+
+
+# ---- encoding -------------------------------------------------------------
+
+def _str_array(values) -> np.ndarray:
+    return np.asarray([str(v) for v in values], dtype=str) if len(values) else np.zeros(0, dtype="U1")
+
+
+def _encode_matrix(df: pd.DataFrame, name: str, arrays: dict) -> dict:
+    arrays[f"{name}.values"] = np.ascontiguousarray(df.to_numpy(dtype=np.float64))
+    arrays[f"{name}.index"] = _str_array(df.index)
+    arrays[f"{name}.columns"] = _str_array(df.columns)
+    return {"kind": "matrix"}
+
+
+def _encode_frame(df, name: str, arrays: dict) -> dict:
+    if isinstance(df, SnapshotFrame):  # reused by a reload: copy the columns as they are
+        columns = []
+        for i, col in enumerate(df.columns):
+            arrays[f"{name}.{i}"] = df.arrays[col]
+            if col in df.nulls:
+                arrays[f"{name}.{i}.null"] = df.nulls[col]
+            columns.append({"name": col, "kind": "str" if df.arrays[col].dtype.kind == "U" else "num",
+                            "nulls": col in df.nulls})
+        return {"kind": "frame", "rows": len(df), "columns": columns}
+    columns = []
+    for i, col in enumerate(df.columns):
+        s = df[col]; key = f"{name}.{i}"
+        if pd.api.types.is_numeric_dtype(s) and not pd.api.types.is_bool_dtype(s):
+            arrays[key] = s.to_numpy()
+            columns.append({"name": str(col), "kind": "num"})
+            continue
+        mask = s.isna().to_numpy()
+        arrays[key] = _str_array(s.where(~mask, "").tolist())
+        if mask.any():
+            arrays[f"{key}.null"] = mask
+        columns.append({"name": str(col), "kind": "str", "nulls": bool(mask.any())})
+    return {"kind": "frame", "rows": int(len(df)), "columns": columns}
+
+
+def _encode_pairs(pairs: set, name: str, arrays: dict) -> dict:
+    arrays[name] = np.asarray(sorted(pairs), dtype="U1").reshape(-1, 2)
+    return {"kind": "pairs"}
+
+
+def _encode_arrays(index, name: str, arrays: dict) -> dict:
+    for key, arr in index.arrays.items():
+        arrays[f"{name}.{key}"] = arr
+    return {"kind": "arrays", "keys": sorted(index.arrays)}
+
+
+def _decode(name: str, meta: dict, load):
+    if meta["kind"] == "arrays":
+        return {key: load(f"{name}.{key}") for key in meta["keys"]}
+    if meta["kind"] == "matrix":
+        return pd.DataFrame(load(f"{name}.values"), index=load(f"{name}.index").astype(object),
+                            columns=load(f"{name}.columns").astype(object))
+    if meta["kind"] == "pairs":
+        return {tuple(p) for p in load(name).tolist()}
+    arrays, nulls = {}, {}
+    for i, col in enumerate(meta["columns"]):
+        arrays[col["name"]] = load(f"{name}.{i}")
+        if col.get("nulls"):
+            nulls[col["name"]] = load(f"{name}.{i}.null")
+    return SnapshotFrame(arrays, nulls, meta["rows"])
+
+
+_ENCODERS = {"matrix": _encode_matrix, "frame": _encode_frame, "pairs": _encode_pairs, "arrays": _encode_arrays}
+
+
+# ---- public API -----------------------------------------------------------
+
+def write_snapshot(snapshot_dir, sources, tables: dict, kinds: dict) -> dict:
+    """Compile ``tables`` into ``snapshot_dir``; ``kinds`` maps table name -> matrix/frame/pairs/arrays."""
+    snapshot_dir = Path(snapshot_dir)
+    fingerprint = fingerprint_sources(sources)
+    arrays, entries = {}, {}
+    for name, value in tables.items():
+        entries[name] = _ENCODERS[kinds[name]](value, name, arrays)
+
+    tmp = snapshot_dir.with_name(f"{snapshot_dir.name}.tmp-{os.getpid()}")
+    shutil.rmtree(tmp, ignore_errors=True)
+    tmp.mkdir(parents=True)
+    checksums = {}
+    for key, arr in arrays.items():
+        path = tmp / f"{key}.npy"
+        np.save(path, arr, allow_pickle=False)
+        checksums[key] = _sha256(path)
+    manifest = {
+        "format": SNAPSHOT_FORMAT,
+        "version": data_version(fingerprint),
+        "created": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+        "sources": fingerprint,
+        "tables": entries,
+        "checksums": checksums,
+    }
+    (tmp / MANIFEST).write_text(json.dumps(manifest, indent=1))
+
+    # Swap directories so concurrent readers never see a half-written snapshot.
+    old = snapshot_dir.with_name(f"{snapshot_dir.name}.old-{os.getpid()}")
+    if snapshot_dir.exists():
+        os.replace(snapshot_dir, old)
+    os.replace(tmp, snapshot_dir)
+    shutil.rmtree(old, ignore_errors=True)
+    return manifest
+
+
+def read_manifest(snapshot_dir):
+    try:
+        manifest = json.loads((Path(snapshot_dir) / MANIFEST).read_text())
+    except (OSError, ValueError):
+        return None
+    return manifest if manifest.get("format") == SNAPSHOT_FORMAT else None
+
+
+def load_snapshot(snapshot_dir, sources, attempts: int = 3):
+    """Return ``(tables, manifest)`` from a fresh snapshot, or ``None`` if missing/stale.
+
+    Reads take no lock, so a rebuild may swap the directory while the arrays
+    are being opened; the manifest is read again afterwards and the load
+    retried unless the arrays are known to belong to it.
+    """
+    snapshot_dir = Path(snapshot_dir)
+    load = lambda key: np.load(snapshot_dir / f"{key}.npy", mmap_mode="r", allow_pickle=False)
+    for _ in range(attempts):
+        manifest = read_manifest(snapshot_dir)
+        if manifest is None or not sources_match(manifest, sources):
+            return None
+        try:
+            tables = {name: _decode(name, meta, load) for name, meta in manifest["tables"].items()}
+        except (OSError, ValueError, KeyError):
+            tables = None  # swapped out from under us, or corrupt; the manifest check below tells which
+        if read_manifest(snapshot_dir) == manifest:
+            return (tables, manifest) if tables is not None else None
+    return None
+
+
+def verify_snapshot(snapshot_dir) -> list:
+    """Return the array keys whose checksum does not match the manifest."""
+    snapshot_dir = Path(snapshot_dir)
+    manifest = read_manifest(snapshot_dir) or {}
+    bad = []
+    for key, digest in manifest.get("checksums", {}).items():
+        path = snapshot_dir / f"{key}.npy"
+        if not path.exists() or _sha256(path) != digest:
+            bad.append(key)
+    return bad
+
+
+def main(argv=None):
+    from core.predictor import KinaseMutationPredictor, SNAPSHOT_DIR
+
+    parser = argparse.ArgumentParser(prog="python -m core.snapshot", description="Compile or inspect the reference-data snapshot.")
+    parser.add_argument("command", choices=["build", "verify", "info"])
+    parser.add_argument("--dir", type=Path, default=SNAPSHOT_DIR, help="snapshot directory (default: %(default)s)")
+    args = parser.parse_args(argv)
+
+    if args.command == "build":
+        t0 = time.perf_counter()
+        manifest = KinaseMutationPredictor.build_snapshot(args.dir)
+        print(f"built snapshot {manifest['version']} in {args.dir} ({time.perf_counter() - t0:.2f}s)")
+        return 0
+    if args.command == "verify":
+        if read_manifest(args.dir) is None:
+            print(f"no snapshot in {args.dir}"); return 1
+        bad = verify_snapshot(args.dir)
+        for key in bad:
+            print(f"checksum mismatch: {key}")
+        print("ok" if not bad else f"{len(bad)} corrupt array(s)")
+        return 1 if bad else 0
+    manifest = read_manifest(args.dir)
+    if manifest is None:
+        print(f"no snapshot in {args.dir}"); return 1
+    print(f"version {manifest['version']} (format {manifest['format']}, built {manifest['created']})")
+    for name, entry in manifest["sources"].items():
+        print(f"  {name}: {'missing' if entry is None else str(entry['size']) + ' bytes'}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,55 @@
+# core/suggest.py
+"""In-memory typeahead index over the gene and kinase name lists.
+
+Matches rank exact name first, then names starting with the query (in
+alphabetical order), then names containing it elsewhere (earliest match
+first).  Prefixes are found by binary search over the sorted upper-cased
+names; other substrings go through bigram/trigram posting lists, so a
+query only touches candidate names.
+"""
+from bisect import bisect_left
+from collections import defaultdict
+from itertools import islice
+import hashlib
+
+
+class SuggestIndex:
+    def __init__(self, names):
+        self.names = list(dict.fromkeys(n for n in names if n))
+        self.version = hashlib.sha256("\n".join(self.names).encode()).hexdigest()[:12]
+        self._upper = [n.upper() for n in self.names]
+        self._sorted = sorted(range(len(self.names)), key=lambda i: (self._upper[i], i))
+        self._sorted_keys = [self._upper[i] for i in self._sorted]
+        grams = defaultdict(list)
+        for i, name in enumerate(self._upper):
+            for n in (2, 3):
+                for g in {name[j:j + n] for j in range(len(name) - n + 1)}:
+                    grams[g].append(i)
+        self._grams = {g: frozenset(ids) for g, ids in grams.items()}
+
+    def _prefixed(self, q):
+        start = bisect_left(self._sorted_keys, q)
+        for k in range(start, len(self._sorted_keys)):
+            if not self._sorted_keys[k].startswith(q):
+                break
+            yield self._sorted[k]
+
+    def _containing(self, q):
+        if len(q) < 2:
+            candidates = range(len(self.names))
+        else:
+            n = min(len(q), 3)
+            postings = sorted((self._grams.get(q[j:j + n], frozenset()) for j in range(len(q) - n + 1)), key=len)
+            candidates = postings[0].intersection(*postings[1:]) if postings[0] else ()
+        hits = ((self._upper[i].find(q), self._upper[i], i) for i in candidates)
+        return [i for pos, _, i in sorted(h for h in hits if h[0] > 0)]
+
+    def suggest(self, query: str, limit: int = 20) -> list:
+        q = (query or "").strip().upper()
+        if not q:
+            return self.names[:limit]
+        # An exact match sorts first among the names it prefixes.
+        out = list(islice(self._prefixed(q), limit))
+        if len(out) < limit:
+            out.extend(self._containing(q)[: limit - len(out)])
+        return [self.names[i] for i in out]
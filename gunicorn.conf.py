@@ -0,0 +1,44 @@
+# gunicorn.conf.py
+from pathlib import Path
+import gc, os, shutil, tempfile
+
+workers = 2
+threads = int(os.environ.get("GUNICORN_THREADS", 4))
+timeout = 120
+# Load the reference tables once in the master (app.py calls get_predictor() at import);
+# forked workers then share them copy-on-write. Set GUNICORN_PRELOAD=0 to load per worker.
+preload_app = os.environ.get("GUNICORN_PRELOAD", "1") != "0"
+# Workers write their /metrics counters under METRICS_DIR so any worker can report the
+# totals; use a fresh directory per server unless one is given (then start it empty).
+_metrics_tmp = None
+if os.environ.get("METRICS_DIR"):
+    for stale in Path(os.environ["METRICS_DIR"]).glob("*.bin"):
+        stale.unlink(missing_ok=True)
+else:
+    os.environ["METRICS_DIR"] = _metrics_tmp = tempfile.mkdtemp(prefix="kmp-metrics-")
+
+
+def when_ready(server):
+    # With preload_app the master built its own metrics file while loading the app; fold it
+    # into the retired totals so only workers count as processes. Importing here (not first
+    # in child_exit, a signal handler) also keeps numpy's import out of signal context.
+    from core.metrics import retire_process
+    retire_process(os.environ["METRICS_DIR"], os.getpid())
+
+
+def pre_fork(server, worker):
+    # Move everything loaded so far out of the collector's reach so worker GC passes
+    # don't write to (and un-share) the master's pages.
+    if preload_app:
+        gc.freeze()
+
+
+def child_exit(server, worker):
+    # Keep an exited worker's counters, but stop reporting it as a live process.
+    from core.metrics import retire_process
+    retire_process(os.environ["METRICS_DIR"], worker.pid)
+
+
+def on_exit(server):
+    if _metrics_tmp:
+        shutil.rmtree(_metrics_tmp, ignore_errors=True)
@@ -43,13 +43,13 @@ async function predict() {
 function bindExamples() {
   document.querySelectorAll(".chip").forEach(chip => {
     chip.addEventListener("click", () => {
-      // Clear search inputs and restore all options
+      // Clear search inputs
       el("kinase-search").value = '';
       el("gene-search").value = '';
       
       // Set values
-      el("kinase").value = chip.dataset.k;
-      el("gene").value   = chip.dataset.g;
+      ensureOption(el("kinase"), chip.dataset.k);
+      ensureOption(el("gene"), chip.dataset.g);
       el("substrate").value = chip.dataset.s;
       el("position").value  = chip.dataset.p;
       el("new_aa").value    = chip.dataset.aa;
@@ -60,90 +60,99 @@ function bindExamples() {
   });
 }
 
-// Search functionality for select dropdowns
-function initSearchFilters() {
-  // Store original options for both selects
-  const kinaseSelect = el('kinase');
-  const geneSelect = el('gene');
-  const kinaseOptions = Array.from(kinaseSelect.options).map(opt => ({value: opt.value, text: opt.textContent}));
-  const geneOptions = Array.from(geneSelect.options).map(opt => ({value: opt.value, text: opt.textContent}));
+// Make sure a select can show `value` (the page only ships the default kinase/gene)
+function ensureOption(selectElement, value) {
+  if (!Array.from(selectElement.options).some(opt => opt.value === value)) {
+    const optElement = document.createElement('option');
+    optElement.value = value;
+    optElement.textContent = value;
+    selectElement.prepend(optElement);
+  }
+  selectElement.value = value;
+}
 
-  function filterSelect(selectElement, options, searchTerm) {
+// Search functionality for select dropdowns, backed by /api/suggest
+function initSearchFilters() {
+  function fillSelect(selectElement, values, searchTerm) {
     const currentValue = selectElement.value;
     selectElement.innerHTML = '';
-    
-    const filteredOptions = options.filter(option => 
-      option.text.toLowerCase().includes(searchTerm.toLowerCase())
-    );
-    
-    if (filteredOptions.length === 0) {
+
+    if (values.length === 0) {
       const noResultOption = document.createElement('option');
       noResultOption.textContent = 'No matches found';
       noResultOption.disabled = true;
       selectElement.appendChild(noResultOption);
       return;
     }
-    
+
     let hasCurrentValue = false;
-    filteredOptions.forEach(option => {
+    values.forEach(value => {
       const optElement = document.createElement('option');
-      optElement.value = option.value;
-      optElement.textContent = option.text;
-      if (option.value === currentValue) {
+      optElement.value = value;
+      optElement.textContent = value;
+      if (value === currentValue) {
         optElement.selected = true;
         hasCurrentValue = true;
       }
       selectElement.appendChild(optElement);
     });
-    
-    // If current value is not in filtered results, select first option
-    if (!hasCurrentValue && filteredOptions.length > 0) {
-      selectElement.selectedIndex = 0;
-      selectElement.dispatchEvent(new Event('change'));
+
+    if (!hasCurrentValue) {
+      if (searchTerm === '' && currentValue) {
+        // Cleared search: keep the current choice selected
+        ensureOption(selectElement, currentValue);
+      } else {
+        // If current value is not in filtered results, select first option
+        selectElement.selectedIndex = 0;
+        selectElement.dispatchEvent(new Event('change'));
+      }
     }
   }
 
-  // Kinase search
-  el('kinase-search').addEventListener('input', (e) => {
-    filterSelect(kinaseSelect, kinaseOptions, e.target.value);
-  });
-
-  // Gene search  
-  el('gene-search').addEventListener('input', (e) => {
-    filterSelect(geneSelect, geneOptions, e.target.value);
-  });
+  function bindSearch(type, searchInput, selectElement) {
+    let timer = null;
+    let controller = null;
 
-  // Add clear button functionality
-  el('kinase-search').addEventListener('keydown', (e) => {
-    if (e.key === 'Escape') {
-      e.target.value = '';
-      filterSelect(kinaseSelect, kinaseOptions, '');
+    async function suggest(searchTerm) {
+      if (controller) controller.abort();
+      controller = new AbortController();
+      try {
+        const params = new URLSearchParams({type: type, q: searchTerm, limit: '50'});
+        const res = await fetch(`/api/suggest?${params}`, {signal: controller.signal});
+        const data = await res.json();
+        fillSelect(selectElement, data.results || [], searchTerm);
+      } catch (e) {
+        if (e.name !== 'AbortError') console.error(e);
+      }
     }
-  });
 
-  el('gene-search').addEventListener('keydown', (e) => {
-    if (e.key === 'Escape') {
-      e.target.value = '';
-      filterSelect(geneSelect, geneOptions, '');
-    }
-  });
+    // Debounce keystrokes; the server answers from a prefix/trigram index
+    searchInput.addEventListener('input', (e) => {
+      clearTimeout(timer);
+      timer = setTimeout(() => suggest(e.target.value.trim()), 150);
+    });
 
-  // Clear search and restore all options when select changes
-  kinaseSelect.addEventListener('change', () => {
-    const searchInput = el('kinase-search');
-    if (searchInput.value !== '') {
-      searchInput.value = '';
-      filterSelect(kinaseSelect, kinaseOptions, '');
-    }
-  });
-  
-  geneSelect.addEventListener('change', () => {
-    const searchInput = el('gene-search');
-    if (searchInput.value !== '') {
-      searchInput.value = '';
-      filterSelect(geneSelect, geneOptions, '');
-    }
-  });
+    // Load the first page of names when the search box is first used
+    searchInput.addEventListener('focus', () => suggest(searchInput.value.trim()), {once: true});
+
+    // Add clear button functionality
+    searchInput.addEventListener('keydown', (e) => {
+      if (e.key === 'Escape') {
+        e.target.value = '';
+        suggest('');
+      }
+    });
+
+    // Clear search when select changes
+    selectElement.addEventListener('change', () => {
+      if (searchInput.value !== '') {
+        searchInput.value = '';
+      }
+    });
+  }
+
+  bindSearch('kinase', el('kinase-search'), el('kinase'));
+  bindSearch('gene', el('gene-search'), el('gene'));
 }
 
 ["substrate","position","new_aa"].forEach(id=>{
@@ -0,0 +1,10 @@
+# tests/conftest.py
+import pytest
+
+from core.predictor import KinaseMutationPredictor
+from core.rng import SCHEMES
+
+
+@pytest.fixture(scope="session", params=SCHEMES)
+def predictor(request):
+    return KinaseMutationPredictor(scoring_scheme=request.param)
@@ -0,0 +1,18 @@
+# tests/mutations.py
+import numpy as np
+
+AAS = "ARNDCQEGHILKMFPSTWYV"
+
+
+def random_mutations(predictor, n, seed=0):
+    """``predict_mutation_impact`` argument tuples over real kinases, mostly fully scored."""
+    rng = np.random.default_rng(seed)
+    out = []
+    for _ in range(n):
+        tyrosine = rng.random() < 0.3
+        pssm = predictor.tyrosine_pssm if tyrosine else predictor.serthr_pssm
+        motif = list(rng.choice(list(AAS), 11)); motif[5] = "Y" if tyrosine else str(rng.choice(["S", "T"]))
+        motif = "".join(motif)
+        position = int(rng.integers(11))
+        out.append((str(rng.choice(pssm.kinases)), "GENE", motif, position, motif[position], str(rng.choice(list(AAS)))))
+    return out
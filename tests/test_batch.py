@@ -0,0 +1,33 @@
+# tests/test_batch.py
+import pytest
+
+from core.rng import SCALAR_KEYS, SCALAR_SEEDS
+from tests.mutations import random_mutations
+
+EDGE_CASES = [
+    ("AKT1", "GENE", "RPQSPVGTGSY", 1, "P", "X"),   # unknown new residue
+    ("AKT1", "GENE", "RPQSPVGTGSY", 1, "P", ""),    # missing new residue
+    ("AKT1", "GENE", "RPQSPVGTGSY", 1, "Q", "A"),   # original residue does not match the motif
+    ("AKT1", "GENE", "RPQSPVGTGS", 1, "P", "A"),    # motif too short
+    ("AKT1", "GENE", "RPQSPVGTGSY", 11, "Y", "A"),  # position out of range
+    ("AKT1", "GENE", "RPQSPVGTGSY", 5, "S", "A"),   # loss of the central serine
+]
+
+
+def _same(a, b):
+    return (a.category, a.score, a.impacts, a.error, a.disease_hits, a.markdown) == \
+           (b.category, b.score, b.impacts, b.error, b.disease_hits, b.markdown)
+
+
+@pytest.mark.parametrize("n", [5, max(SCALAR_SEEDS, SCALAR_KEYS) + 50])
+def test_predict_batch_matches_per_call(predictor, n):
+    rows = random_mutations(predictor, n, seed=n) + EDGE_CASES
+    batch = predictor.predict_batch(rows)
+    single = [predictor.predict_mutation_impact(*row) for row in rows]
+    mismatched = [row for row, a, b in zip(rows, batch, single) if not _same(a, b)]
+    assert not mismatched
+
+
+def test_unknown_residue_is_invalid_not_an_error(predictor):
+    for row in EDGE_CASES[:2]:
+        assert predictor.predict_mutation_impact(*row).error.startswith("Error: Unknown amino acid")
@@ -0,0 +1,46 @@
+# tests/test_preload.py
+import importlib.util, sys, threading
+
+import pytest
+
+import core.predictor as predictor_module
+
+
+def test_get_predictor_loads_once_across_threads(monkeypatch):
+    constructed = []
+
+    class Counting(predictor_module.KinaseMutationPredictor):
+        def __init__(self, *args, **kwargs):
+            constructed.append(self)
+            super().__init__(*args, **kwargs)
+
+    monkeypatch.setattr(predictor_module, "KinaseMutationPredictor", Counting)
+    monkeypatch.setattr(predictor_module, "_predictor", None)
+    start, seen = threading.Barrier(8), []
+
+    def worker():
+        start.wait()
+        seen.append(predictor_module.get_predictor())
+
+    threads = [threading.Thread(target=worker) for _ in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert len(constructed) == 1
+    assert all(p is constructed[0] for p in seen)
+
+
+@pytest.mark.skipif(not sys.platform.startswith("linux"), reason="reads /proc/<pid>/smaps_rollup")
+@pytest.mark.skipif(importlib.util.find_spec("gunicorn") is None, reason="gunicorn is not installed")
+def test_preloaded_workers_share_the_reference_tables():
+    from benchmarks.bench_memory import measure
+
+    def mean_uss(preload):
+        workers = measure(preload, requests=10)["workers"].values()
+        assert workers
+        return sum(m["uss"] for m in workers) / len(workers)
+
+    separate, shared = mean_uss(False), mean_uss(True)
+    # Without preload each worker holds its own copy of the tables; with it they stay shared.
+    assert shared < 0.5 * separate, (shared, separate)
@@ -0,0 +1,20 @@
+# tests/test_result.py
+import markdown
+
+from core.predictor import ANALYSIS_TEMPLATE
+from core.result import render_html
+from tests.test_batch import EDGE_CASES
+from tests.mutations import random_mutations
+
+
+def test_html_matches_markdown_conversion(predictor):
+    rows = random_mutations(predictor, 500, seed=3) + EDGE_CASES
+    results = [predictor.predict_mutation_impact(*row) for row in rows] + predictor.predict_batch(rows)
+    mismatched = [r.markdown for r in results if r.to_html() != markdown.markdown(r.markdown, extensions=["extra"])]
+    assert not mismatched
+
+
+def test_html_values_are_escaped():
+    values = ["<script>"] * ANALYSIS_TEMPLATE.count("{}")
+    html = render_html(ANALYSIS_TEMPLATE, values)
+    assert "<script>" not in html and "&lt;script&gt;" in html
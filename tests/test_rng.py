@@ -0,0 +1,78 @@
+# tests/test_rng.py
+"""Pinned outputs of the scoring schemes.
+
+A scheme's outputs must never change: results stored or published under it
+could no longer be reproduced.  The draws are pinned as SHA-256 digests of
+their float64 bytes, and the fast paths must match numpy's own generators.
+"""
+import hashlib
+
+import numpy as np
+import pytest
+
+from core.predictor import KinaseMutationPredictor
+from core.rng import (SCALAR_KEYS, SCALAR_SEEDS, SCHEMES, key_hash, key_hashes, pcg64_uniforms, philox_draws,
+                      philox_uniforms, scheme_uniforms, seed_for_key)
+
+DRAWS = 10
+PINNED_DRAWS = {
+    "v1": "8784f8099218ae0fe19b5d01156246a8a45f72c09f648582bc9149078cd105a3",
+    "v2": "cac6d653d23a4cec89e5bb9f42b36f5e7bd427b846e9436017cba4d4286ff368",
+}
+MUTATIONS = [("AKT1", "GENE", "RPQSPVGTGSY", 1, "P", "A"), ("AKT1", "GENE", "GGRARTSSFAE", 2, "R", "E"),
+             ("SRC", "GENE", "EEEDYEEEEEE", 4, "Y", "F"), ("CK2A1", "GENE", "PLSPRTPLSPG", 8, "S", "D")]
+PINNED_SCORES = {
+    "v1": [("Minimal Impact", 9.007148893566896), ("Low Impact", 26.96392752561324),
+           ("Low Impact", 20.625736047273218), ("Minimal Impact", 7.607546692076824)],
+    "v2": [("Minimal Impact", 8.997048754690692), ("Low Impact", 22.15322411418466),
+           ("Low Impact", 18.957250752183295), ("Minimal Impact", 3.766679201788017)],
+}
+KEYS = [f"{k}||{m}||{p}||{aa}" for k in ("AKT1", "ERK2", "SRC", "CK2A1", "PKACA")
+        for m in ("RPQSPVGTGSY", "GGRARTSSFAE", "EEEDYEEEEEE", "PLSPRTPLSPG") for p in (0, 3, 5, 6, 10) for aa in "ADGKLPSTWY"]
+
+
+def _numpy_draws(scheme, keys, n=DRAWS):
+    # numpy's own generators, constructed from scratch for every key.
+    if scheme == "v1":
+        return np.array([np.random.default_rng(seed_for_key(k)).random(n) for k in keys])
+    return np.array([np.random.Generator(np.random.Philox(key=key_hash(k))).random(n) for k in keys])
+
+
+@pytest.fixture(scope="module", params=SCHEMES)
+def scheme(request):
+    return request.param
+
+
+def test_draws_are_pinned(scheme):
+    digest = hashlib.sha256(_numpy_draws(scheme, KEYS).astype("<f8").tobytes()).hexdigest()
+    assert digest == PINNED_DRAWS[scheme]
+
+
+def test_vectorized_draws_match_numpy():
+    assert np.array_equal(pcg64_uniforms([seed_for_key(k) for k in KEYS], DRAWS), _numpy_draws("v1", KEYS))
+    assert np.array_equal(philox_uniforms(key_hashes(KEYS), DRAWS), _numpy_draws("v2", KEYS))
+
+
+def test_scalar_philox_draws_match_numpy():
+    assert np.array_equal([philox_draws(key_hash(k), DRAWS) for k in KEYS[:50]], _numpy_draws("v2", KEYS[:50]))
+
+
+@pytest.mark.parametrize("n", [1, min(SCALAR_SEEDS, SCALAR_KEYS) - 1, max(SCALAR_SEEDS, SCALAR_KEYS) + 1])
+def test_scheme_uniforms_match_numpy(scheme, n):
+    expected = _numpy_draws(scheme, KEYS[:n])
+    assert np.array_equal(scheme_uniforms(scheme, KEYS[:n], DRAWS), expected)
+    assert np.array_equal(scheme_uniforms(scheme, np.array([k.encode() for k in KEYS[:n]]), DRAWS), expected)
+
+
+def test_unknown_scheme_is_rejected():
+    with pytest.raises(ValueError):
+        scheme_uniforms("v3", KEYS[:1], DRAWS)
+    with pytest.raises(ValueError):
+        KinaseMutationPredictor(scoring_scheme="v3")
+
+
+def test_prediction_scores_are_pinned(predictor):
+    results = [predictor.predict_mutation_impact(*m) for m in MUTATIONS]
+    assert [r.overall for r in results] == [c for c, _ in PINNED_SCORES[predictor.scoring_scheme]]
+    assert [r.score for r in results] == pytest.approx([s for _, s in PINNED_SCORES[predictor.scoring_scheme]],
+                                                       rel=0, abs=1e-9)
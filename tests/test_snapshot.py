@@ -0,0 +1,35 @@
+# tests/test_snapshot.py
+import numpy as np
+import pandas as pd
+
+from benchmarks.synthetic import make_ochoa
+from core.disease import DiseaseIndex
+from core.predictor import DISEASE_DATA_FILE
+from core.sites import SiteIndex
+from core.snapshot import SnapshotFrame, load_snapshot, write_snapshot
+
+KINDS = {"ochoa": "frame", "disease": "frame"}
+
+
+def _same_arrays(a, b):
+    return a.keys() == b.keys() and all(np.array_equal(a[k], b[k]) for k in a)
+
+
+def test_frames_stay_mapped_and_index_like_dataframes(tmp_path):
+    disease = pd.read_excel(DISEASE_DATA_FILE)
+    ochoa, _ = make_ochoa(2000, disease, ["GENE1", "GENE2"], seed=1)
+    ochoa.loc[3, "Gene"] = ochoa.loc[7, "Phosphosite"] = ochoa.loc[9, "sequence_window"] = np.nan
+    write_snapshot(tmp_path / "snapshot", [], {"ochoa": ochoa, "disease": disease}, KINDS)
+    tables, _ = load_snapshot(tmp_path / "snapshot", [])
+    frame = tables["ochoa"]
+
+    assert isinstance(frame, SnapshotFrame) and frame._frame is None
+    assert _same_arrays(DiseaseIndex.build(frame, tables["disease"]).arrays, DiseaseIndex.build(ochoa, disease).arrays)
+    assert _same_arrays(SiteIndex.build(frame).arrays, SiteIndex.build(ochoa).arrays)
+    assert frame._frame is None  # the indexes read the mapped columns only
+    pd.testing.assert_frame_equal(frame.frame, ochoa, check_dtype=False)
+
+    # A reload that reuses the table writes its columns back unchanged.
+    write_snapshot(tmp_path / "again", [], tables, KINDS)
+    again, _ = load_snapshot(tmp_path / "again", [])
+    pd.testing.assert_frame_equal(again["ochoa"].frame, ochoa, check_dtype=False)